@@ -5,4 +5,13 @@ class UsersConfig(AppConfig):
     
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.users'
-    verbose_name = 'Gerenciamento de Usuários'
\ No newline at end of file
+    verbose_name = 'Gerenciamento de Usuários'
+
+    def ready(self):
+        from .lookups import Any
+        from .models import User
+
+        # __any só nos campos que o usam (id e email, via Lower("email")),
+        # não em todo Field do projeto
+        for name in ('id', 'email'):
+            User._meta.get_field(name).register_lookup(Any)
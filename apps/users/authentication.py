@@ -0,0 +1,89 @@
+from django.conf import settings
+from django.utils.functional import cached_property
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from .cache import get_cached_user
+from .revocation import get_revocation_list
+
+
+class ClaimsUser(TokenUser):
+    """Usuário montado apenas a partir das claims assinadas do token."""
+
+    @cached_property
+    def email(self):
+        return self.token.get('email', '')
+
+    @cached_property
+    def name(self):
+        return self.token.get('name', '')
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    Autenticação JWT que resolve o usuário pelo cache em vez de consultar o
+    banco a cada requisição. Com JWT_STATELESS_AUTH=True o usuário é montado
+    somente a partir das claims do token, sem cache nem banco. Em ambos os
+    modos tokens revogados (logout) são rejeitados.
+    """
+
+    def get_validated_token(self, raw_token):
+        validated_token = super().get_validated_token(raw_token)
+
+        jti = validated_token.get(api_settings.JTI_CLAIM)
+        if jti and get_revocation_list().is_revoked(jti):
+            raise InvalidToken('Token revogado')
+
+        return validated_token
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken('Token não contém identificação do usuário')
+
+        if settings.JWT_STATELESS_AUTH:
+            return ClaimsUser(validated_token)
+
+        user = get_cached_user(user_id)
+
+        if user is None:
+            raise AuthenticationFailed('Usuário não encontrado', code='user_not_found')
+
+        if not user.is_active:
+            raise AuthenticationFailed('Usuário inativo', code='user_inactive')
+
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(
+                api_settings.REVOKE_TOKEN_CLAIM
+            ) != get_md5_hash_password(user.password):
+                raise AuthenticationFailed(
+                    'A senha do usuário foi alterada', code='password_changed'
+                )
+
+        return user
+
+
+def has_revoked_tokens(data):
+    """Se o `access` ou o `refresh` de uma resposta de login já foi revogado."""
+    revocation = get_revocation_list()
+
+    for token_class, name in ((AccessToken, 'access'), (RefreshToken, 'refresh')):
+        jti = token_class(data[name], verify=False).get(api_settings.JTI_CLAIM)
+        if jti and revocation.is_revoked(jti):
+            return True
+
+    return False
+
+
+def tokens_for_user(user):
+    refresh = RefreshToken.for_user(user)
+    refresh['email'] = user.email
+    refresh['name'] = user.name
+    refresh['is_staff'] = user.is_staff
+    refresh['is_superuser'] = user.is_superuser
+    return refresh
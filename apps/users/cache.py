@@ -0,0 +1,69 @@
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+
+USER_CACHE_PREFIX = 'users:user'
+
+
+def _generation_key(user_id):
+    return f'{USER_CACHE_PREFIX}:{user_id}:gen'
+
+
+def _entry_key(user_id, generation):
+    return f'{USER_CACHE_PREFIX}:{user_id}:v{generation}'
+
+
+def get_cached_user(user_id):
+    """
+    Retorna o usuário pelo id usando um cache versionado.
+
+    Cada usuário possui uma geração; invalidar troca a geração por um valor
+    novo, de modo que uma leitura concorrente que repopule o cache com dados
+    antigos grava numa chave que nunca mais será lida.
+    """
+    return get_cached_users([user_id]).get(user_id)
+
+
+def get_cached_users(user_ids):
+    """
+    Versão em lote de get_cached_user: duas leituras get_many no cache e uma
+    única consulta id = ANY(...) para os ausentes. Retorna {id: usuário}.
+    """
+    from .models import User
+
+    generation_keys = {user_id: _generation_key(user_id) for user_id in user_ids}
+    generations = cache.get_many(generation_keys.values())
+
+    entry_keys = {
+        user_id: _entry_key(user_id, generations.get(key, 0))
+        for user_id, key in generation_keys.items()
+    }
+    entries = cache.get_many(entry_keys.values())
+
+    users = {
+        user_id: entries[key] for user_id, key in entry_keys.items() if key in entries
+    }
+
+    missing = [user_id for user_id in entry_keys if user_id not in users]
+    if missing:
+        loaded = {user.id: user for user in User.objects.filter(id__any=missing)}
+        cache.set_many(
+            {entry_keys[user_id]: user for user_id, user in loaded.items()},
+            settings.USER_CACHE_TTL,
+        )
+        users.update(loaded)
+
+    return users
+
+
+def invalidate_user(user_id):
+    invalidate_users([user_id])
+
+
+def invalidate_users(user_ids):
+    """Invalida vários usuários com um único set_many."""
+    cache.set_many(
+        {_generation_key(user_id): uuid.uuid4().hex for user_id in user_ids},
+        None,
+    )
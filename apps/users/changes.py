@@ -0,0 +1,90 @@
+import base64
+import binascii
+import heapq
+import json
+
+from django.db import connection
+from django.db.models import Q
+
+CHANGES_DEFAULT_LIMIT = 100
+CHANGES_MAX_LIMIT = 1000
+
+# Posição de cada tipo de registro no desempate da mesma transação
+UPSERT, DELETE = 0, 1
+
+
+def encode_cursor(txid, kind, pk):
+    return base64.urlsafe_b64encode(json.dumps([txid, kind, pk]).encode()).decode()
+
+
+def decode_cursor(cursor):
+    try:
+        txid, kind, pk = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        if kind not in (UPSERT, DELETE) or not isinstance(txid, int):
+            raise ValueError
+        return txid, kind, int(pk)
+    except (binascii.Error, ValueError, TypeError):
+        raise ValueError("Cursor inválido")
+
+
+def visible_txid_bound():
+    """
+    Menor transação ainda em andamento (pg_snapshot_xmin). Toda transação com
+    id menor já confirmou ou foi desfeita, então linhas com txid abaixo deste
+    limite não mudam mais de visibilidade. Chamar fora de transações que
+    escrevem: a própria transação também fica abaixo do limite.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT pg_snapshot_xmin(pg_current_snapshot())::text::bigint")
+        return cursor.fetchone()[0]
+
+
+def list_changes(since=None, limit=CHANGES_DEFAULT_LIMIT):
+    """
+    Usuários criados, alterados ou desativados e removidos depois do cursor.
+
+    Cada linha guarda em `txid` a transação que a gravou (trigger da migração
+    0009). Usuários são lidos por keyset em (txid, id) e as remoções definitivas
+    (cleanup_inactive_users) pelos eventos user.deleted do outbox, também em
+    (txid, id). As duas listas são intercaladas numa única ordem
+    (txid, tipo, id), que é o que o cursor guarda.
+
+    Só entram transações abaixo de visible_txid_bound(): uma transação que
+    confirma depois da leitura tem txid acima do limite e portanto à frente do
+    cursor, qualquer que seja a demora do commit.
+
+    Retorna (usuários, eventos de remoção, cursor seguinte, há mais).
+    """
+    from .models import User, UserEvent
+
+    bound = visible_txid_bound()
+    users = User.objects.filter(txid__lt=bound).order_by('txid', 'id')
+    deletions = (
+        UserEvent.objects
+        .filter(event_type=UserEvent.EventType.DELETED, txid__lt=bound)
+        .order_by('txid', 'id')
+    )
+
+    if since:
+        txid, kind, pk = decode_cursor(since)
+        if kind == UPSERT:
+            users = users.filter(Q(txid__gt=txid) | Q(txid=txid, id__gt=pk))
+            deletions = deletions.filter(txid__gte=txid)
+        else:
+            users = users.filter(txid__gt=txid)
+            deletions = deletions.filter(Q(txid__gt=txid) | Q(txid=txid, id__gt=pk))
+
+    merged = list(heapq.merge(
+        ((user.txid, UPSERT, user.pk, user) for user in users[:limit + 1]),
+        ((event.txid, DELETE, event.pk, event) for event in deletions[:limit + 1]),
+        key=lambda item: item[:3],
+    ))
+
+    has_more = len(merged) > limit
+    merged = merged[:limit]
+
+    next_cursor = encode_cursor(*merged[-1][:3]) if merged else since
+    changed = [record for _, kind, _, record in merged if kind == UPSERT]
+    deleted = [record for _, kind, _, record in merged if kind == DELETE]
+
+    return changed, deleted, next_cursor, has_more
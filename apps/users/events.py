@@ -0,0 +1,17 @@
+from django.utils import timezone
+
+from .models import UserEvent
+
+
+def emit_events(event_type, user_ids, payload=None):
+    """Grava um evento por usuário no outbox com um único INSERT."""
+    now = timezone.now()
+    return UserEvent.objects.bulk_create(
+        UserEvent(
+            event_type=event_type,
+            user_id=user_id,
+            payload=payload or {},
+            created_at=now,
+        )
+        for user_id in user_ids
+    )
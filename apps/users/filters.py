@@ -0,0 +1,69 @@
+from django.db.models import CharField, Func
+
+ORDERING_CHOICES = ['-created_at', 'created_at', '-updated_at', 'updated_at']
+DEFAULT_ORDERING = '-created_at'
+
+RANGE_FILTERS = {
+    'created_after': ('created_at', 'gte'),
+    'created_before': ('created_at', 'lt'),
+    'updated_after': ('updated_at', 'gte'),
+    'updated_before': ('updated_at', 'lt'),
+}
+
+# (filtro de igualdade principal, campo de ordenação) -> índice que atende a
+# consulta. Combinações fora desta tabela exigiriam ordenar a tabela inteira
+# (seq scan + sort) e são rejeitadas.
+INDEXED_PLANS = {
+    ('is_active', 'created_at'): 'users_active_created_idx',
+    ('is_active', 'updated_at'): 'users_active_updated_idx',
+    ('is_staff', 'created_at'): 'users_staff_created_idx',
+    ('email_domain', 'created_at'): 'users_domain_created_idx',
+}
+
+
+class EmailDomain(Func):
+    """Domínio do email; o manager normaliza o domínio para minúsculas."""
+
+    template = "split_part(%(expressions)s, '@', 2)"
+    output_field = CharField()
+
+
+def get_index_plan(params):
+    """Retorna o índice que atende os filtros/ordenação, ou None se não houver."""
+    if params.get('email_domain'):
+        leading = 'email_domain'
+    elif params.get('is_staff'):
+        leading = 'is_staff'
+    else:
+        leading = 'is_active'
+
+    sort_field = params.get('ordering', DEFAULT_ORDERING).lstrip('-')
+
+    for param, (field, _) in RANGE_FILTERS.items():
+        if param in params and field != sort_field:
+            return None
+
+    return INDEXED_PLANS.get((leading, sort_field))
+
+
+def filter_users(queryset, params, active_by_default=True):
+    # A listagem mostra só ativos se is_active não vier; operações em lote
+    # (active_by_default=False) só filtram por is_active quando ele é informado
+    if 'is_active' in params or active_by_default:
+        queryset = queryset.filter(is_active=params.get('is_active', True))
+
+    if 'is_staff' in params:
+        queryset = queryset.filter(is_staff=params['is_staff'])
+
+    if params.get('email_domain'):
+        queryset = queryset.alias(email_domain=EmailDomain('email')).filter(
+            email_domain=params['email_domain'].lower()
+        )
+
+    for param, (field, lookup) in RANGE_FILTERS.items():
+        if param in params:
+            queryset = queryset.filter(**{f'{field}__{lookup}': params[param]})
+
+    ordering = params.get('ordering', DEFAULT_ORDERING)
+    direction = '-' if ordering.startswith('-') else ''
+    return queryset.order_by(ordering, f'{direction}id')
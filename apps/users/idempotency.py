@@ -0,0 +1,153 @@
+import hashlib
+import time
+import uuid
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse, JsonResponse
+from django.utils.crypto import salted_hmac
+from rest_framework import status
+
+IDEMPOTENCY_PREFIX = 'idempotency'
+IDEMPOTENCY_HEADER = 'HTTP_IDEMPOTENCY_KEY'
+REPLAYED_HEADER = 'Idempotent-Replayed'
+MAX_KEY_LENGTH = 255
+POLL_INTERVAL = 0.05
+
+# 403 vem do rate limit (Ratelimited); 429 e 5xx são transitórios e podem ser refeitos
+NON_REPLAYABLE_STATUSES = {status.HTTP_403_FORBIDDEN, status.HTTP_429_TOO_MANY_REQUESTS}
+
+
+def _cache_keys(request, key):
+    digest = hashlib.sha256(key.encode()).hexdigest()
+    scope = f'{IDEMPOTENCY_PREFIX}:{request.method}:{request.path}:{digest}'
+    return f'{scope}:response', f'{scope}:lock'
+
+
+def _fingerprint(request):
+    # Mesma chave com outro corpo (ou outra credencial) não pode receber a resposta guardada.
+    # HMAC com a SECRET_KEY: o corpo pode ter senha, e um hash puro no cache permitiria
+    # testar senhas candidatas offline
+    value = request.body + b'\0' + request.META.get('HTTP_AUTHORIZATION', '').encode()
+    return salted_hmac(IDEMPOTENCY_PREFIX, value, algorithm='sha256').hexdigest()
+
+
+def _get_stored(response_key, fingerprint, replayable):
+    stored = cache.get(response_key)
+
+    if (
+        stored is not None
+        and replayable is not None
+        and stored['fingerprint'] == fingerprint
+        and not replayable(stored)
+    ):
+        # A resposta guardada não vale mais (ex.: tokens revogados): executa de novo
+        cache.delete(response_key)
+        return None
+
+    return stored
+
+
+def _replay(stored, fingerprint):
+    if stored['fingerprint'] != fingerprint:
+        return JsonResponse(
+            {"error": "Idempotency-Key já usada com outra requisição"},
+            status=status.HTTP_422_UNPROCESSABLE_ENTITY,
+        )
+
+    response = HttpResponse(stored['body'], status=stored['status'])
+    # Cabeçalhos da view (Cache-Control no-store do login, Vary, ...) valem também na repetição
+    for name, value in stored['headers']:
+        response[name] = value
+    response[REPLAYED_HEADER] = 'true'
+    return response
+
+
+def _release_lock(lock_key, lock_token):
+    # Após IDEMPOTENCY_LOCK_TIMEOUT a trava pode ter expirado e sido tomada por
+    # outra requisição: só apaga a que ainda é nossa
+    if cache.get(lock_key) == lock_token:
+        cache.delete(lock_key)
+
+
+def _execute(view_func, request, args, kwargs, response_key, fingerprint, ttl):
+    response = view_func(request, *args, **kwargs)
+
+    if hasattr(response, 'render') and not response.is_rendered:
+        response.render()
+
+    if (
+        response.status_code < 500
+        and response.status_code not in NON_REPLAYABLE_STATUSES
+        and not response.streaming
+    ):
+        cache.set(response_key, {
+            'fingerprint': fingerprint,
+            'status': response.status_code,
+            'headers': list(response.items()),
+            'body': response.content,
+        }, ttl)
+
+    return response
+
+
+def idempotent(methods=('POST',), ttl_setting='IDEMPOTENCY_TTL', replayable=None):
+    """
+    Suporte ao header Idempotency-Key, para decorar o `dispatch` da view.
+
+    A primeira resposta fica no cache pelo tempo da setting `ttl_setting` e as
+    repetições são servidas dela, antes de autenticação, rate limit, banco ou
+    hashing. Repetições concorrentes esperam a execução em andamento (trava no
+    cache) por até IDEMPOTENCY_WAIT_TIMEOUT segundos em vez de executar de novo.
+
+    `replayable(stored)`, se informado, decide se a resposta guardada ainda
+    pode ser devolvida; se não puder, ela é descartada e a view roda de novo.
+    """
+    def decorator(view_func):
+        @wraps(view_func)
+        def wrapped(request, *args, **kwargs):
+            key = request.META.get(IDEMPOTENCY_HEADER)
+            if key is None or request.method not in methods:
+                return view_func(request, *args, **kwargs)
+
+            if not key or len(key) > MAX_KEY_LENGTH:
+                return JsonResponse(
+                    {"error": f"Idempotency-Key deve ter entre 1 e {MAX_KEY_LENGTH} caracteres"},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+
+            response_key, lock_key = _cache_keys(request, key)
+            fingerprint = _fingerprint(request)
+            deadline = time.monotonic() + settings.IDEMPOTENCY_WAIT_TIMEOUT
+            lock_token = uuid.uuid4().hex
+
+            while True:
+                stored = _get_stored(response_key, fingerprint, replayable)
+                if stored is not None:
+                    return _replay(stored, fingerprint)
+
+                if cache.add(lock_key, lock_token, settings.IDEMPOTENCY_LOCK_TIMEOUT):
+                    try:
+                        # A execução anterior pode ter terminado entre o get e o add
+                        stored = _get_stored(response_key, fingerprint, replayable)
+                        if stored is not None:
+                            return _replay(stored, fingerprint)
+                        return _execute(
+                            view_func, request, args, kwargs, response_key, fingerprint,
+                            getattr(settings, ttl_setting),
+                        )
+                    finally:
+                        _release_lock(lock_key, lock_token)
+
+                if time.monotonic() >= deadline:
+                    return JsonResponse(
+                        {"error": "Requisição com esta Idempotency-Key ainda em processamento"},
+                        status=status.HTTP_409_CONFLICT,
+                    )
+
+                time.sleep(POLL_INTERVAL)
+
+        return wrapped
+
+    return decorator
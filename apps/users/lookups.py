@@ -0,0 +1,19 @@
+from django.db.models import Lookup
+
+
+class Any(Lookup):
+    """
+    campo = ANY(%s) com um único parâmetro array, em vez de IN (%s, %s, ...):
+    o SQL não varia com o tamanho da lista.
+    """
+
+    lookup_name = 'any'
+    prepare_rhs = False
+
+    def get_db_prep_lookup(self, value, connection):
+        return '%s', [list(value)]
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f'{lhs} = ANY({rhs})', lhs_params + rhs_params
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from core.openapi import SchemaCache, generate_schema
+
+
+class Command(BaseCommand):
+    help = "Gera o schema OpenAPI servido em /api/schema/ (evita introspecção no primeiro acesso)"
+
+    def add_arguments(self, parser):
+        from django.conf import settings
+
+        parser.add_argument('--output', default=settings.OPENAPI_SCHEMA_PATH)
+
+    def handle(self, *args, **options):
+        output = options['output']
+        body = SchemaCache(output, generator=generate_schema).build()
+
+        self.stdout.write(self.style.SUCCESS(f"Schema OpenAPI ({len(body)} bytes) gravado em {output}"))
@@ -0,0 +1,54 @@
+import os
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth import password_validation
+from django.core.management.base import BaseCommand, CommandError
+
+from core.blocklist import DEFAULT_DIGEST_SIZE, build_blocklist
+
+DJANGO_COMMON_PASSWORDS = Path(password_validation.__file__).resolve().parent / 'common-passwords.txt.gz'
+
+
+class Command(BaseCommand):
+    help = (
+        "Gera o arquivo binário de senhas bloqueadas a partir de listas em texto "
+        "(uma senha por linha) ou de hashes SHA-1 no formato do Have I Been Pwned"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'sources', nargs='*',
+            help="Arquivos de origem (.txt ou .gz). Padrão: lista de senhas comuns do Django"
+        )
+        parser.add_argument('--output', default=settings.PASSWORD_BLOCKLIST_PATH)
+        parser.add_argument('--digest-size', type=int, default=DEFAULT_DIGEST_SIZE)
+        parser.add_argument('--chunk-size', type=int, default=1_000_000)
+        parser.add_argument(
+            '--skip-existing', action='store_true',
+            help="Não faz nada se o arquivo de saída já existir"
+        )
+
+    def handle(self, *args, **options):
+        output = options['output']
+
+        if options['skip_existing'] and os.path.exists(output):
+            self.stdout.write(f"Blocklist já existe em {output}")
+            return
+
+        if not 4 <= options['digest_size'] <= 20:
+            raise CommandError("--digest-size deve estar entre 4 e 20")
+
+        sources = options['sources'] or [str(DJANGO_COMMON_PASSWORDS)]
+        for source in sources:
+            if not os.path.exists(source):
+                raise CommandError(f"Arquivo não encontrado: {source}")
+
+        count = build_blocklist(
+            sources,
+            output,
+            digest_size=options['digest_size'],
+            chunk_size=options['chunk_size'],
+        )
+
+        self.stdout.write(self.style.SUCCESS(f"{count} senhas gravadas em {output}"))
@@ -0,0 +1,46 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from core.startup import measure_startup
+
+
+class Command(BaseCommand):
+    help = (
+        "Mede o boot de um worker WSGI num processo novo (-X importtime): "
+        "tempo, memória e custo de import por pacote e por módulo"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--top', type=int, default=20)
+        parser.add_argument('--runs', type=int, default=3, help="Execuções; reporta a mais rápida")
+        parser.add_argument('--settings-module', default=None)
+        parser.add_argument('--no-urls', action='store_true', help="Não carrega o URLconf")
+        parser.add_argument('--json', action='store_true')
+
+    def handle(self, *args, **options):
+        reports = [
+            measure_startup(options['settings_module'], load_urls=not options['no_urls'])
+            for _ in range(max(options['runs'], 1))
+        ]
+        report = min(reports, key=lambda r: r['elapsed_s'])
+        top = options['top']
+
+        if options['json']:
+            report = dict(report, packages=report['packages'][:top], top_level=report['top_level'][:top])
+            report.pop('loaded')
+            self.stdout.write(json.dumps(report, indent=2))
+            return
+
+        self.stdout.write(
+            f"Boot: {report['elapsed_s'] * 1000:.0f} ms, RSS {report['rss_kb'] / 1024:.1f} MB, "
+            f"{report['modules']} módulos ({report['import_s'] * 1000:.0f} ms em imports)\n"
+        )
+
+        self.stdout.write("Por pacote (self):")
+        for package, self_us in report['packages'][:top]:
+            self.stdout.write(f"  {self_us / 1000:8.1f} ms  {package}")
+
+        self.stdout.write("\nImports de primeiro nível (cumulativo):")
+        for name, cumulative_us in report['top_level'][:top]:
+            self.stdout.write(f"  {cumulative_us / 1000:8.1f} ms  {name}")
@@ -0,0 +1,71 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.users.models import WebhookDelivery, WebhookSubscription
+from apps.users.webhooks import deliver_webhooks, requeue_dead, subscribe
+
+
+class Command(BaseCommand):
+    help = "Gerencia assinaturas de webhook e envia os lotes pendentes"
+
+    def add_arguments(self, parser):
+        actions = parser.add_subparsers(dest='action', required=True)
+
+        add = actions.add_parser('add', help="Cria uma assinatura a partir dos próximos eventos")
+        add.add_argument('url')
+        add.add_argument(
+            '--events', default='',
+            help="Tipos separados por vírgula (ex.: user.created,user.deleted). Padrão: todos"
+        )
+
+        actions.add_parser('list', help="Lista as assinaturas e seus lotes pendentes e descartados")
+
+        deliver = actions.add_parser('deliver', help="Agrupa os eventos novos e envia os lotes vencidos")
+        deliver.add_argument('--loop', action='store_true', help="Continua rodando até ser interrompido")
+        deliver.add_argument('--interval', type=float, default=1.0, help="Pausa quando não há trabalho")
+
+        requeue = actions.add_parser('requeue', help="Devolve os lotes descartados à fila")
+        requeue.add_argument('--subscription', type=int, default=None)
+
+    def handle(self, *args, **options):
+        getattr(self, f"handle_{options['action']}")(options)
+
+    def handle_add(self, options):
+        event_types = [e.strip() for e in options['events'].split(',') if e.strip()]
+        try:
+            subscription = subscribe(options['url'], event_types)
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        self.stdout.write(f"Assinatura {subscription.id} criada para {subscription.url}")
+        self.stdout.write(f"Segredo: {subscription.secret}")
+
+    def handle_list(self, options):
+        for subscription in WebhookSubscription.objects.all():
+            deliveries = subscription.deliveries
+            pending = deliveries.filter(status=WebhookDelivery.Status.PENDING).count()
+            dead = deliveries.filter(status=WebhookDelivery.Status.DEAD).count()
+            self.stdout.write(
+                f"{subscription.id:>4}  {'ativa' if subscription.is_active else 'inativa':7}  "
+                f"{subscription.url}  eventos={','.join(subscription.event_types) or 'todos'}  "
+                f"pendentes={pending}  descartados={dead}"
+            )
+
+    def handle_deliver(self, options):
+        while True:
+            stats = deliver_webhooks()
+            if any(stats.values()):
+                self.stdout.write(
+                    f"{stats['batched']} lotes criados, {stats['delivered']} entregues, "
+                    f"{stats['retried']} reagendados, {stats['dead']} descartados"
+                )
+
+            if not options['loop']:
+                return
+            if not any(stats.values()):
+                time.sleep(options['interval'])
+
+    def handle_requeue(self, options):
+        count = requeue_dead(options['subscription'])
+        self.stdout.write(f"{count} lotes devolvidos à fila")
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.1 on 2026-10-18 22:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='last_seen_at',
+            field=models.DateTimeField(blank=True, help_text='Última requisição autenticada (gravada em lote, com granularidade)', null=True, verbose_name='Visto por último em'),
+        ),
+    ]
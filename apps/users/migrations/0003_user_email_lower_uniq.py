@@ -0,0 +1,44 @@
+# Generated by Django 5.0.1 on 2026-10-18 22:21
+
+import django.db.models.functions.text
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.models.functions import Lower
+
+
+def check_case_duplicates(apps, schema_editor):
+    # normalize_email só normaliza o domínio: Foo@x.com e foo@x.com podem já
+    # coexistir e fariam o AddConstraint falhar no meio da migração
+    User = apps.get_model('users', 'User')
+    users = User.objects.using(schema_editor.connection.alias).annotate(email_lower=Lower('email'))
+    duplicates = list(
+        users.values('email_lower')
+        .annotate(total=Count('id'))
+        .filter(total__gt=1)
+        .values_list('email_lower', flat=True)
+    )
+
+    if duplicates:
+        conflicts = users.filter(email_lower__in=duplicates).order_by('email_lower', 'id')
+        lines = '\n'.join(f"  id={user.id} {user.email}" for user in conflicts)
+        raise RuntimeError(
+            "Emails que diferem só em maiúsculas/minúsculas impedem criar "
+            "users_email_lower_uniq. Mescle ou renomeie estas contas e rode a "
+            f"migração de novo:\n{lines}"
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('users', '0002_user_last_seen_at'),
+    ]
+
+    operations = [
+        migrations.RunPython(check_case_duplicates, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='user',
+            constraint=models.UniqueConstraint(django.db.models.functions.text.Lower('email'), name='users_email_lower_uniq'),
+        ),
+    ]
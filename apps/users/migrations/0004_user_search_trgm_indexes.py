@@ -0,0 +1,42 @@
+# Generated by Django 5.0.1 on 2026-10-18 22:24
+
+import apps.users.search
+import django.contrib.postgres.indexes
+from django.contrib.postgres.operations import TrigramExtension, UnaccentExtension
+from django.db import migrations
+
+# unaccent() é STABLE; o wrapper IMMUTABLE permite usá-lo num índice de expressão
+CREATE_IMMUTABLE_UNACCENT = """
+CREATE OR REPLACE FUNCTION users_unaccent(text) RETURNS text
+LANGUAGE sql IMMUTABLE PARALLEL SAFE STRICT
+AS $$ SELECT public.unaccent('public.unaccent'::regdictionary, $1) $$;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('users', '0003_user_email_lower_uniq'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        UnaccentExtension(),
+        migrations.RunSQL(
+            CREATE_IMMUTABLE_UNACCENT,
+            reverse_sql="DROP FUNCTION IF EXISTS users_unaccent(text);",
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass('name', name='gin_trgm_ops'), name='users_name_trgm'),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass('email', name='gin_trgm_ops'), name='users_email_trgm'),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(apps.users.search.ImmutableUnaccent('name'), name='gin_trgm_ops'), name='users_name_unaccent_trgm'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.0.1 on 2026-10-18 22:27
+
+import apps.users.filters
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('users', '0004_user_search_trgm_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['is_active', 'created_at', 'id'], name='users_active_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['is_active', 'updated_at', 'id'], name='users_active_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(condition=models.Q(('is_staff', True)), fields=['created_at', 'id'], name='users_staff_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(apps.users.filters.EmailDomain('email'), models.F('created_at'), models.F('id'), name='users_domain_created_idx'),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.0.1 on 2026-10-18 22:31
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0005_user_list_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('event_type', models.CharField(choices=[('user.created', 'Criado'), ('user.updated', 'Atualizado'), ('user.deactivated', 'Desativado')], max_length=50, verbose_name='Tipo')),
+                ('user_id', models.BigIntegerField(db_index=True, verbose_name='Usuário')),
+                ('payload', models.JSONField(blank=True, default=dict, verbose_name='Dados')),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Criado em')),
+            ],
+            options={
+                'verbose_name': 'Evento de usuário',
+                'verbose_name_plural': 'Eventos de usuários',
+                'db_table': 'user_events',
+                'ordering': ['id'],
+            },
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.0.1 on 2026-10-18 23:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('users', '0006_user_events'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='userevent',
+            name='event_type',
+            field=models.CharField(choices=[('user.created', 'Criado'), ('user.updated', 'Atualizado'), ('user.deactivated', 'Desativado'), ('user.deleted', 'Removido')], max_length=50, verbose_name='Tipo'),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['updated_at', 'id'], name='users_updated_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='userevent',
+            index=models.Index(condition=models.Q(('event_type', 'user.deleted')), fields=['created_at', 'id'], name='user_events_deleted_idx'),
+        ),
+    ]
@@ -0,0 +1,55 @@
+# Generated by Django 5.0.1 on 2026-10-18 23:09
+
+import apps.users.models
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0007_user_changes_feed'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WebhookSubscription',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('url', models.URLField(max_length=500, verbose_name='URL')),
+                ('secret', models.CharField(default=apps.users.models.generate_webhook_secret, max_length=128, verbose_name='Segredo')),
+                ('event_types', models.JSONField(blank=True, default=list, verbose_name='Tipos de evento')),
+                ('is_active', models.BooleanField(default=True, verbose_name='Ativo')),
+                ('last_event_id', models.BigIntegerField(default=0, verbose_name='Último evento')),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Criado em')),
+            ],
+            options={
+                'verbose_name': 'Assinatura de webhook',
+                'verbose_name_plural': 'Assinaturas de webhook',
+                'db_table': 'webhook_subscriptions',
+                'ordering': ['id'],
+            },
+        ),
+        migrations.CreateModel(
+            name='WebhookDelivery',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('events', models.JSONField(verbose_name='Eventos')),
+                ('status', models.CharField(choices=[('pending', 'Pendente'), ('dead', 'Descartada')], default='pending', max_length=10, verbose_name='Status')),
+                ('attempts', models.PositiveIntegerField(default=0, verbose_name='Tentativas')),
+                ('next_attempt_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Próxima tentativa')),
+                ('last_status_code', models.PositiveSmallIntegerField(blank=True, null=True, verbose_name='Último status HTTP')),
+                ('last_error', models.CharField(blank=True, max_length=500, verbose_name='Último erro')),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Criado em')),
+                ('subscription', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='deliveries', to='users.webhooksubscription', verbose_name='Assinatura')),
+            ],
+            options={
+                'verbose_name': 'Entrega de webhook',
+                'verbose_name_plural': 'Entregas de webhook',
+                'db_table': 'webhook_deliveries',
+                'ordering': ['id'],
+                'indexes': [models.Index(condition=models.Q(('status', 'pending')), fields=['next_attempt_at'], name='webhook_deliveries_due_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,71 @@
+# Generated by Django 5.0.1 on 2026-10-18 23:21
+
+from django.db import migrations, models
+
+# txid = transação que gravou a linha. Tudo abaixo de pg_snapshot_xmin() já terminou,
+# então o feed e os webhooks podem avançar o cursor sem pular commits atrasados.
+# Em users só conta a escrita que muda updated_at (last_seen_at não entra no feed).
+CREATE_TXID_TRIGGERS = """
+CREATE OR REPLACE FUNCTION set_row_txid() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    NEW.txid := pg_current_xact_id()::text::bigint;
+    RETURN NEW;
+END
+$$;
+
+CREATE TRIGGER users_txid_insert BEFORE INSERT ON users
+FOR EACH ROW EXECUTE FUNCTION set_row_txid();
+
+CREATE TRIGGER users_txid_update BEFORE UPDATE ON users
+FOR EACH ROW WHEN (OLD.updated_at IS DISTINCT FROM NEW.updated_at)
+EXECUTE FUNCTION set_row_txid();
+
+CREATE TRIGGER user_events_txid_insert BEFORE INSERT ON user_events
+FOR EACH ROW EXECUTE FUNCTION set_row_txid();
+"""
+
+DROP_TXID_TRIGGERS = """
+DROP TRIGGER IF EXISTS users_txid_insert ON users;
+DROP TRIGGER IF EXISTS users_txid_update ON users;
+DROP TRIGGER IF EXISTS user_events_txid_insert ON user_events;
+DROP FUNCTION IF EXISTS set_row_txid();
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('users', '0008_webhooks'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='user',
+            name='users_updated_id_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='userevent',
+            name='user_events_deleted_idx',
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='txid',
+            field=models.BigIntegerField(default=0, editable=False, help_text='Id da transação que gravou a última alteração (keyset do feed de alterações)', verbose_name='Transação'),
+        ),
+        migrations.AddField(
+            model_name='userevent',
+            name='txid',
+            field=models.BigIntegerField(default=0, editable=False, verbose_name='Transação'),
+        ),
+        migrations.RunSQL(CREATE_TXID_TRIGGERS, reverse_sql=DROP_TXID_TRIGGERS),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['txid', 'id'], name='users_txid_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='userevent',
+            index=models.Index(condition=models.Q(('event_type', 'user.deleted')), fields=['txid', 'id'], name='user_events_deleted_txid_idx'),
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.0.1 on 2026-10-18 23:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0009_changes_feed_txid'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='webhooksubscription',
+            name='last_event_txid',
+            field=models.BigIntegerField(default=0, verbose_name='Transação do último evento'),
+        ),
+        migrations.AddIndex(
+            model_name='userevent',
+            index=models.Index(fields=['txid', 'id'], name='user_events_txid_id_idx'),
+        ),
+    ]
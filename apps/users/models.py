@@ -1,4 +1,8 @@
-from django.db import models
+import secrets
+
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.db import connections, models, transaction
+from django.db.models.functions import Lower
 from django.contrib.auth.models import (
     AbstractBaseUser,
     BaseUserManager,
@@ -10,6 +14,10 @@ from django.utils import timezone
 from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
 
+from .cache import invalidate_user
+from .filters import EmailDomain
+from .search import ImmutableUnaccent
+
 
 class UserManager(BaseUserManager):
 
@@ -35,6 +43,97 @@ class UserManager(BaseUserManager):
 
         return self.create_user(email, name, password, **extra_fields)
 
+    def create_user_if_absent(self, email, name, password=None, **extra_fields):
+        """Cria o usuário numa única ida ao banco; retorna None se o email já existe."""
+        if not email:
+            raise ValueError("O email é obrigatório")
+
+        created, _ = self.bulk_create_users(
+            [dict(email=email, name=name, password=password, **extra_fields)]
+        )
+        return created[0] if created else None
+
+    def bulk_create_users(self, records):
+        """
+        Insere todos os registros com um único INSERT ... ON CONFLICT DO NOTHING
+        RETURNING. Retorna (usuários criados, emails em conflito), incluindo
+        duplicados dentro do próprio lote.
+        """
+        users = []
+        for record in records:
+            record = dict(record)
+            password = record.pop("password", None)
+            user = self.model(email=self.normalize_email(record.pop("email")), **record)
+            user.set_password(password)
+            users.append(user)
+
+        if not users:
+            return [], []
+
+        connection = connections[self.db]
+        fields = [f for f in self.model._meta.concrete_fields if not f.primary_key]
+        columns = ", ".join(connection.ops.quote_name(f.column) for f in fields)
+        row = "(" + ", ".join(["%s"] * len(fields)) + ")"
+        params = [
+            f.get_db_prep_save(f.pre_save(user, True), connection)
+            for user in users
+            for f in fields
+        ]
+
+        sql = (
+            f"INSERT INTO {connection.ops.quote_name(self.model._meta.db_table)} ({columns}) "
+            f"VALUES {', '.join([row] * len(users))} "
+            "ON CONFLICT DO NOTHING RETURNING id, email"
+        )
+
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            inserted = {email.lower(): pk for pk, email in cursor.fetchall()}
+
+        created, conflicts = [], []
+        for user in users:
+            pk = inserted.pop(user.email.lower(), None)
+            if pk is None:
+                conflicts.append(user.email)
+                continue
+
+            user.pk = pk
+            user._state.adding = False
+            user._state.db = self.db
+            created.append(user)
+
+        return created, conflicts
+
+    def update_returning_ids(self, queryset, **changes):
+        """
+        Aplica as alterações a todas as linhas do queryset com um único
+        UPDATE ... WHERE id IN (...) RETURNING id e retorna os ids afetados.
+        Não dispara signals: invalidação de cache e eventos ficam com o chamador.
+        """
+        connection = connections[self.db]
+        changes["updated_at"] = timezone.now()
+
+        fields = [self.model._meta.get_field(name) for name in changes]
+        assignments = ", ".join(
+            f"{connection.ops.quote_name(f.column)} = %s" for f in fields
+        )
+        params = [f.get_db_prep_save(changes[f.name], connection) for f in fields]
+
+        select_sql, select_params = (
+            queryset.order_by().values("id").query.sql_with_params()
+        )
+        sql = (
+            f"UPDATE {connection.ops.quote_name(self.model._meta.db_table)} "
+            f"SET {assignments} WHERE id IN ({select_sql}) RETURNING id"
+        )
+
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params + list(select_params))
+            return [row[0] for row in cursor.fetchall()]
+
+    def get_by_email(self, email):
+        return self.alias(email_lower=Lower("email")).get(email_lower=email.lower())
+
 
 class User(AbstractBaseUser, PermissionsMixin):
     email = models.EmailField(
@@ -72,6 +171,21 @@ class User(AbstractBaseUser, PermissionsMixin):
         auto_now=True,
         help_text="Data e hora da última atualização",
     )
+
+    last_seen_at = models.DateTimeField(
+        verbose_name="Visto por último em",
+        null=True,
+        blank=True,
+        help_text="Última requisição autenticada (gravada em lote, com granularidade)",
+    )
+
+    # Gravado por trigger (migração 0009) quando updated_at muda
+    txid = models.BigIntegerField(
+        verbose_name="Transação",
+        default=0,
+        editable=False,
+        help_text="Id da transação que gravou a última alteração (keyset do feed de alterações)",
+    )
     
     groups = models.ManyToManyField(
         Group,
@@ -100,6 +214,36 @@ class User(AbstractBaseUser, PermissionsMixin):
         verbose_name_plural = "Usuários"
         ordering = ["-created_at"]
         db_table = "users"
+        constraints = [
+            models.UniqueConstraint(Lower("email"), name="users_email_lower_uniq"),
+        ]
+        indexes = [
+            GinIndex(OpClass("name", name="gin_trgm_ops"), name="users_name_trgm"),
+            GinIndex(OpClass("email", name="gin_trgm_ops"), name="users_email_trgm"),
+            GinIndex(
+                OpClass(ImmutableUnaccent("name"), name="gin_trgm_ops"),
+                name="users_name_unaccent_trgm",
+            ),
+            models.Index(
+                fields=["is_active", "created_at", "id"], name="users_active_created_idx"
+            ),
+            models.Index(
+                fields=["is_active", "updated_at", "id"], name="users_active_updated_idx"
+            ),
+            # Keyset do feed de alterações (/api/users/changes/)
+            models.Index(fields=["txid", "id"], name="users_txid_id_idx"),
+            models.Index(
+                fields=["created_at", "id"],
+                name="users_staff_created_idx",
+                condition=models.Q(is_staff=True),
+            ),
+            models.Index(
+                EmailDomain("email"),
+                models.F("created_at"),
+                models.F("id"),
+                name="users_domain_created_idx",
+            ),
+        ]
 
     def __str__(self):
         return f"{self.name} ({self.email})"
@@ -111,6 +255,156 @@ class User(AbstractBaseUser, PermissionsMixin):
         return self.name.split()[0] if self.name else ""
 
 
+class UserEvent(models.Model):
+    """Outbox de eventos do ciclo de vida do usuário, gravado na mesma transação."""
+
+    class EventType(models.TextChoices):
+        CREATED = "user.created", "Criado"
+        UPDATED = "user.updated", "Atualizado"
+        DEACTIVATED = "user.deactivated", "Desativado"
+        DELETED = "user.deleted", "Removido"
+
+    event_type = models.CharField(
+        verbose_name="Tipo", max_length=50, choices=EventType.choices
+    )
+
+    # Sem FK: o evento sobrevive à remoção definitiva do usuário
+    user_id = models.BigIntegerField(verbose_name="Usuário", db_index=True)
+
+    payload = models.JSONField(verbose_name="Dados", default=dict, blank=True)
+
+    created_at = models.DateTimeField(
+        verbose_name="Criado em", default=timezone.now
+    )
+
+    # Gravado por trigger (migração 0009) com o id da transação do INSERT
+    txid = models.BigIntegerField(verbose_name="Transação", default=0, editable=False)
+
+    class Meta:
+        verbose_name = "Evento de usuário"
+        verbose_name_plural = "Eventos de usuários"
+        ordering = ["id"]
+        db_table = "user_events"
+        indexes = [
+            # Leitura do outbox pelos webhooks
+            models.Index(fields=["txid", "id"], name="user_events_txid_id_idx"),
+            # Tombstones do feed de alterações, em (txid, id)
+            models.Index(
+                fields=["txid", "id"],
+                name="user_events_deleted_txid_idx",
+                condition=models.Q(event_type="user.deleted"),
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.event_type} ({self.user_id})"
+
+
+def generate_webhook_secret():
+    return secrets.token_urlsafe(32)
+
+
+class WebhookSubscription(models.Model):
+    """
+    Destino de webhooks. (`last_event_txid`, `last_event_id`) é a posição no
+    outbox (UserEvent) até a qual os eventos já foram agrupados em entregas.
+    """
+
+    url = models.URLField(verbose_name="URL", max_length=500)
+
+    secret = models.CharField(
+        verbose_name="Segredo", max_length=128, default=generate_webhook_secret
+    )
+
+    # Vazio recebe todos os tipos
+    event_types = models.JSONField(verbose_name="Tipos de evento", default=list, blank=True)
+
+    is_active = models.BooleanField(verbose_name="Ativo", default=True)
+
+    last_event_txid = models.BigIntegerField(verbose_name="Transação do último evento", default=0)
+
+    last_event_id = models.BigIntegerField(verbose_name="Último evento", default=0)
+
+    created_at = models.DateTimeField(
+        verbose_name="Criado em", default=timezone.now
+    )
+
+    class Meta:
+        verbose_name = "Assinatura de webhook"
+        verbose_name_plural = "Assinaturas de webhook"
+        ordering = ["id"]
+        db_table = "webhook_subscriptions"
+
+    def __str__(self):
+        return self.url
+
+    def accepts(self, event_type):
+        return not self.event_types or event_type in self.event_types
+
+
+class WebhookDelivery(models.Model):
+    """Lote de eventos a enviar para uma assinatura; entregues são removidos."""
+
+    class Status(models.TextChoices):
+        PENDING = "pending", "Pendente"
+        DEAD = "dead", "Descartada"
+
+    subscription = models.ForeignKey(
+        WebhookSubscription,
+        verbose_name="Assinatura",
+        on_delete=models.CASCADE,
+        related_name="deliveries",
+    )
+
+    events = models.JSONField(verbose_name="Eventos")
+
+    status = models.CharField(
+        verbose_name="Status", max_length=10, choices=Status.choices, default=Status.PENDING
+    )
+
+    attempts = models.PositiveIntegerField(verbose_name="Tentativas", default=0)
+
+    next_attempt_at = models.DateTimeField(
+        verbose_name="Próxima tentativa", default=timezone.now
+    )
+
+    last_status_code = models.PositiveSmallIntegerField(
+        verbose_name="Último status HTTP", null=True, blank=True
+    )
+
+    last_error = models.CharField(verbose_name="Último erro", max_length=500, blank=True)
+
+    created_at = models.DateTimeField(
+        verbose_name="Criado em", default=timezone.now
+    )
+
+    class Meta:
+        verbose_name = "Entrega de webhook"
+        verbose_name_plural = "Entregas de webhook"
+        ordering = ["id"]
+        db_table = "webhook_deliveries"
+        indexes = [
+            # Fila de envio: só as pendentes, em ordem de vencimento
+            models.Index(
+                fields=["next_attempt_at"],
+                name="webhook_deliveries_due_idx",
+                condition=models.Q(status="pending"),
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.subscription_id} #{self.pk} ({self.status})"
+
+
 @receiver(post_save, sender=User)
 def sync_user_with_sqlalchemy(sender, instance, created, **kwargs):
     pass
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_user_cache(sender, instance, **kwargs):
+    # Só depois do commit: antes dele, uma leitura concorrente ainda veria a
+    # linha antiga e a guardaria sob a nova geração
+    user_id = instance.pk
+    transaction.on_commit(lambda: invalidate_user(user_id))
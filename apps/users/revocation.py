@@ -0,0 +1,155 @@
+import hashlib
+import math
+import threading
+import time
+
+from django.core.cache import cache
+
+REVOKED_KEY = 'users:revoked:{jti}'
+LOG_SEQ_KEY = 'users:revoked:seq'
+LOG_ENTRY_KEY = 'users:revoked:log:{seq}'
+
+# Entradas relidas a cada sincronização, cobrindo revogações cujo contador já
+# foi incrementado mas cuja entrada de log ainda não havia sido gravada
+SYNC_OVERLAP = 32
+SYNC_CHUNK_SIZE = 1000
+
+
+class BloomFilter:
+    """Filtro de Bloom em memória: sem falsos negativos, falsos positivos ~error_rate."""
+
+    def __init__(self, capacity, error_rate):
+        self.capacity = capacity
+        self.num_bits = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self._bits = bytearray((self.num_bits + 7) // 8)
+        self._count = 0
+
+    def __len__(self):
+        return self._count
+
+    def _positions(self, item):
+        digest = hashlib.blake2b(item.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return [(h1 + i * h2) % self.num_bits for i in range(self.num_hashes)]
+
+    def add(self, item):
+        for pos in self._positions(item):
+            self._bits[pos >> 3] |= 1 << (pos & 7)
+        self._count += 1
+
+    def __contains__(self, item):
+        return all(self._bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(item))
+
+
+class RevocationList:
+    """
+    Lista de tokens revogados (por jti).
+
+    A fonte da verdade é o cache compartilhado (Redis em produção): uma chave
+    por jti com TTL igual ao tempo restante do token, mais um log sequencial
+    usado para sincronizar um filtro de Bloom local em cada worker. Tokens
+    fora do filtro são aceitos sem I/O; só os acertos do filtro são
+    confirmados no cache.
+
+    Cada worker só enxerga revogações feitas em outro worker na próxima
+    sincronização: um token revogado lá continua aceito aqui por até
+    sync_interval segundos.
+    """
+
+    def __init__(self, capacity, error_rate, sync_interval, store=cache):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.sync_interval = sync_interval
+        self.store = store
+        self._filter = BloomFilter(capacity, error_rate)
+        self._seq = 0
+        self._floor = 1
+        # Sequências da janela de sobreposição já aplicadas ao filtro
+        self._applied = set()
+        self._last_sync = 0.0
+        self._lock = threading.Lock()
+
+    def revoke(self, jti, expires_at):
+        ttl = max(int(expires_at - time.time()), 1)
+
+        self.store.set(REVOKED_KEY.format(jti=jti), True, ttl)
+        self.store.add(LOG_SEQ_KEY, 0, None)
+        seq = self.store.incr(LOG_SEQ_KEY)
+        self.store.set(LOG_ENTRY_KEY.format(seq=seq), jti, ttl)
+
+        with self._lock:
+            self._filter.add(jti)
+            self._applied.add(seq)
+
+    def is_revoked(self, jti):
+        if time.monotonic() - self._last_sync >= self.sync_interval:
+            self.sync()
+
+        if jti not in self._filter:
+            return False
+
+        return self.store.get(REVOKED_KEY.format(jti=jti)) is not None
+
+    def _read_log(self, start, stop):
+        for chunk_start in range(start, stop + 1, SYNC_CHUNK_SIZE):
+            chunk_stop = min(chunk_start + SYNC_CHUNK_SIZE - 1, stop)
+            keys = [LOG_ENTRY_KEY.format(seq=seq) for seq in range(chunk_start, chunk_stop + 1)]
+            entries = self.store.get_many(keys)
+            for seq in range(chunk_start, chunk_stop + 1):
+                yield seq, entries.get(LOG_ENTRY_KEY.format(seq=seq))
+
+    def sync(self):
+        if not self._lock.acquire(blocking=False):
+            return
+
+        try:
+            current = self.store.get(LOG_SEQ_KEY, 0)
+
+            if current < self._seq or len(self._filter) > self._filter.capacity:
+                self._rebuild(current)
+            elif current > self._seq:
+                start = max(self._floor, self._seq - SYNC_OVERLAP + 1)
+                for seq, jti in self._read_log(start, current):
+                    if jti is not None and seq not in self._applied:
+                        self._filter.add(jti)
+                        self._applied.add(seq)
+                self._seq = current
+                self._applied = {seq for seq in self._applied if seq > current - SYNC_OVERLAP}
+
+            self._last_sync = time.monotonic()
+        finally:
+            self._lock.release()
+
+    def _rebuild(self, current):
+        # Recria o filtro só com as revogações ainda vigentes no log
+        start = self._floor if current >= self._seq else 1
+        live = [(seq, jti) for seq, jti in self._read_log(start, current) if jti is not None]
+
+        bloom = BloomFilter(max(self.capacity, 2 * len(live)), self.error_rate)
+        for _, jti in live:
+            bloom.add(jti)
+
+        self._filter = bloom
+        self._seq = current
+        self._applied = {seq for seq, _ in live if seq > current - SYNC_OVERLAP}
+        self._floor = live[0][0] if live else current + 1
+
+
+_revocation_list = None
+
+
+def get_revocation_list():
+    global _revocation_list
+
+    if _revocation_list is None:
+        from django.conf import settings
+
+        _revocation_list = RevocationList(
+            capacity=settings.TOKEN_REVOCATION_CAPACITY,
+            error_rate=settings.TOKEN_REVOCATION_ERROR_RATE,
+            sync_interval=settings.TOKEN_REVOCATION_SYNC_INTERVAL,
+        )
+
+    return _revocation_list
@@ -0,0 +1,77 @@
+import base64
+import binascii
+import json
+
+from django.contrib.postgres.search import TrigramWordSimilarity
+from django.db.models import F, FloatField, Func, Q, TextField, Value
+from django.db.models.functions import Cast, Greatest
+
+SEARCH_MIN_LENGTH = 3
+SEARCH_MAX_LENGTH = 100
+SEARCH_DEFAULT_LIMIT = 20
+SEARCH_MAX_LIMIT = 50
+
+
+class ImmutableUnaccent(Func):
+    """unaccent() declarado IMMUTABLE (migração 0004) para poder ser indexado."""
+
+    function = 'users_unaccent'
+    output_field = TextField()
+
+
+def encode_cursor(score, pk):
+    return base64.urlsafe_b64encode(json.dumps([score, pk]).encode()).decode()
+
+
+def decode_cursor(cursor):
+    try:
+        score, pk = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return float(score), int(pk)
+    except (binascii.Error, ValueError, TypeError):
+        raise ValueError("Cursor inválido")
+
+
+def search_users(query, limit=SEARCH_DEFAULT_LIMIT, cursor=None, unaccent=False):
+    """
+    Busca aproximada por nome ou email usando os índices GIN de trigramas.
+
+    Os resultados são ordenados por similaridade e paginados por keyset
+    (score, id). Com unaccent=True o nome é comparado sem acentos, usando o
+    índice sobre users_unaccent(name).
+
+    Retorna (usuários, cursor da próxima página ou None).
+    """
+    from .models import User
+
+    if unaccent:
+        name, term = ImmutableUnaccent('name'), ImmutableUnaccent(Value(query))
+    else:
+        name, term = F('name'), Value(query)
+
+    queryset = (
+        User.objects.alias(search_name=name)
+        .filter(Q(search_name__trigram_word_similar=term) | Q(email__trigram_word_similar=query))
+        .annotate(
+            score=Cast(
+                Greatest(
+                    TrigramWordSimilarity(term, 'search_name'),
+                    TrigramWordSimilarity(query, 'email'),
+                ),
+                FloatField(),
+            )
+        )
+        .order_by('-score', 'id')
+    )
+
+    if cursor:
+        score, pk = decode_cursor(cursor)
+        queryset = queryset.filter(Q(score__lt=score) | Q(score=score, id__gt=pk))
+
+    users = list(queryset[:limit + 1])
+
+    next_cursor = None
+    if len(users) > limit:
+        users = users[:limit]
+        next_cursor = encode_cursor(users[-1].score, users[-1].pk)
+
+    return users, next_cursor
@@ -1,5 +1,17 @@
+from django.core.exceptions import ValidationError as DjangoValidationError
 from rest_framework import serializers
+from rest_framework.fields import empty
+from core.domains import get_domain_policy
 from core.security import validate_password, EmailSecurity
+from .validators import BatchValidator, DUPLICATE_EMAIL_MESSAGE
+from .filters import ORDERING_CHOICES, DEFAULT_ORDERING, get_index_plan
+from .changes import CHANGES_DEFAULT_LIMIT, CHANGES_MAX_LIMIT
+from .search import (
+    SEARCH_MIN_LENGTH,
+    SEARCH_MAX_LENGTH,
+    SEARCH_DEFAULT_LIMIT,
+    SEARCH_MAX_LIMIT,
+)
 
 
 class UserCreateSerializer(serializers.Serializer):
@@ -34,7 +46,12 @@ class UserCreateSerializer(serializers.Serializer):
     def validate_email(self, value):
         if not EmailSecurity.is_valid_email(value):
             raise serializers.ValidationError("Formato de email inválido")
-        return EmailSecurity.normalize_email(value)
+        
+        email = EmailSecurity.normalize_email(value)
+        if get_domain_policy().is_denied(email.rpartition('@')[2]):
+            raise serializers.ValidationError("Emails temporários não são permitidos")
+        
+        return email
     
     def validate_password(self, value):
         is_valid, errors = validate_password(value)
@@ -51,6 +68,56 @@ class UserCreateSerializer(serializers.Serializer):
         return name
 
 
+def batch_validator_for(serializer_class, unique=None):
+    """
+    BatchValidator com as regras dos campos de um serializer (run_validation +
+    validate_<campo>), mantendo as mesmas mensagens de erro.
+    """
+    serializer = serializer_class()
+    field_validators = {}
+    
+    for name, field in serializer.fields.items():
+        if field.read_only:
+            continue
+        
+        def check(value, field=field, method=getattr(serializer, f'validate_{name}', None)):
+            try:
+                value = field.run_validation(value)
+                return method(value) if method is not None else value
+            except serializers.ValidationError as e:
+                detail = e.detail if isinstance(e.detail, list) else [e.detail]
+                raise DjangoValidationError([str(message) for message in detail])
+        
+        field_validators[name] = check
+    
+    return BatchValidator(
+        field_validators,
+        required=[name for name, field in serializer.fields.items() if field.required],
+        unique=unique,
+        missing=empty,
+    )
+
+
+class UserBulkCreateSerializer(serializers.Serializer):
+    MAX_ITEMS = 1000
+    
+    users = serializers.ListField(
+        child=serializers.DictField(),
+        allow_empty=False,
+        max_length=MAX_ITEMS,
+    )
+    
+    batch_validator = batch_validator_for(
+        UserCreateSerializer, unique={'email': DUPLICATE_EMAIL_MESSAGE}
+    )
+    
+    def validate_users(self, value):
+        users, errors = self.batch_validator.validate(value)
+        if errors:
+            raise serializers.ValidationError(errors)
+        return users
+
+
 class UserUpdateSerializer(serializers.Serializer):
     name = serializers.CharField(
         max_length=255,
@@ -71,7 +138,12 @@ class UserUpdateSerializer(serializers.Serializer):
     def validate_email(self, value):
         if not EmailSecurity.is_valid_email(value):
             raise serializers.ValidationError("Formato de email inválido")
-        return EmailSecurity.normalize_email(value)
+        
+        email = EmailSecurity.normalize_email(value)
+        if get_domain_policy().is_denied(email.rpartition('@')[2]):
+            raise serializers.ValidationError("Emails temporários não são permitidos")
+        
+        return email
     
     def validate_password(self, value):
         is_valid, errors = validate_password(value)
@@ -86,7 +158,19 @@ class UserUpdateSerializer(serializers.Serializer):
         return name
 
 
-class UserResponseSerializer(serializers.Serializer):
+class DynamicFieldsMixin:
+    """Aceita fields=[...] e remove do serializer os campos não solicitados."""
+
+    def __init__(self, *args, **kwargs):
+        fields = kwargs.pop('fields', None)
+        super().__init__(*args, **kwargs)
+
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+
+class UserResponseSerializer(DynamicFieldsMixin, serializers.Serializer):
     id = serializers.IntegerField(read_only=True)
     name = serializers.CharField(read_only=True)
     email = serializers.EmailField(read_only=True)
@@ -95,6 +179,153 @@ class UserResponseSerializer(serializers.Serializer):
     updated_at = serializers.DateTimeField(read_only=True)
 
 
+USER_RESPONSE_FIELDS = tuple(UserResponseSerializer._declared_fields)
+
+
+class FieldsQuerySerializer(serializers.Serializer):
+    fields = serializers.CharField(required=False)
+
+    def validate_fields(self, value):
+        fields = [name.strip() for name in value.split(',') if name.strip()]
+        invalid = [name for name in fields if name not in USER_RESPONSE_FIELDS]
+
+        if not fields or invalid:
+            raise serializers.ValidationError(
+                f"Campos inválidos: {', '.join(invalid) or value}. "
+                f"Disponíveis: {', '.join(USER_RESPONSE_FIELDS)}"
+            )
+
+        return fields
+
+
+class UserListQuerySerializer(FieldsQuerySerializer):
+    PAGINATION_PARAMS = {'page', 'page_size'}
+
+    is_active = serializers.BooleanField(required=False)
+    is_staff = serializers.BooleanField(required=False)
+    created_after = serializers.DateTimeField(required=False)
+    created_before = serializers.DateTimeField(required=False)
+    updated_after = serializers.DateTimeField(required=False)
+    updated_before = serializers.DateTimeField(required=False)
+    email_domain = serializers.CharField(required=False, max_length=255)
+    ordering = serializers.ChoiceField(
+        choices=ORDERING_CHOICES,
+        default=DEFAULT_ORDERING
+    )
+
+    def validate(self, data):
+        unknown = set(self.initial_data) - set(self.fields) - self.PAGINATION_PARAMS
+        if unknown:
+            raise serializers.ValidationError(
+                f"Parâmetros não suportados: {', '.join(sorted(unknown))}"
+            )
+
+        if 'is_active' in data and not self.context.get('is_staff'):
+            raise serializers.ValidationError({
+                'is_active': 'Filtro disponível apenas para administradores'
+            })
+
+        if get_index_plan(data) is None:
+            raise serializers.ValidationError(
+                "Combinação de filtros e ordenação não suportada"
+            )
+
+        return data
+
+
+class UserListV2QuerySerializer(UserListQuerySerializer):
+    PAGINATION_PARAMS = {'cursor', 'page_size'}
+
+
+class UserBatchSerializer(FieldsQuerySerializer):
+    MAX_ITEMS = 1000
+
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        required=False,
+        max_length=MAX_ITEMS
+    )
+    emails = serializers.ListField(
+        child=serializers.EmailField(),
+        required=False,
+        max_length=MAX_ITEMS
+    )
+
+    def validate(self, data):
+        if bool(data.get('ids')) == bool(data.get('emails')):
+            raise serializers.ValidationError("Informe ids ou emails (apenas um deles)")
+        return data
+
+
+class UserBulkSelectionSerializer(serializers.Serializer):
+    """Seleção de usuários para operações em lote: lista de ids ou filtro."""
+
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        required=False,
+        allow_empty=False,
+        max_length=10000
+    )
+    filter = serializers.DictField(required=False, allow_empty=False)
+
+    def validate_filter(self, value):
+        # Mesmos filtros (e índices) da listagem
+        serializer = UserListQuerySerializer(data=value, context={'is_staff': True})
+        if not serializer.is_valid():
+            raise serializers.ValidationError(serializer.errors)
+
+        params = dict(serializer.validated_data)
+        params.pop('fields', None)
+        return params
+
+    def validate(self, data):
+        if ('ids' in data) == ('filter' in data):
+            raise serializers.ValidationError("Informe ids ou filter (apenas um deles)")
+        return data
+
+
+class UserBulkChangesSerializer(serializers.Serializer):
+    is_active = serializers.BooleanField(required=False)
+    is_staff = serializers.BooleanField(required=False)
+
+    def validate(self, data):
+        if not data:
+            raise serializers.ValidationError("Nenhuma alteração informada")
+        return data
+
+
+class UserBulkUpdateSerializer(UserBulkSelectionSerializer):
+    changes = UserBulkChangesSerializer(required=True)
+
+
+class UserSearchSerializer(serializers.Serializer):
+    q = serializers.CharField(
+        min_length=SEARCH_MIN_LENGTH,
+        max_length=SEARCH_MAX_LENGTH,
+        required=True,
+        error_messages={
+            'required': 'O parâmetro q é obrigatório',
+            'min_length': f'A busca deve ter pelo menos {SEARCH_MIN_LENGTH} caracteres',
+        }
+    )
+    limit = serializers.IntegerField(
+        min_value=1,
+        max_value=SEARCH_MAX_LIMIT,
+        default=SEARCH_DEFAULT_LIMIT
+    )
+    cursor = serializers.CharField(required=False)
+    unaccent = serializers.BooleanField(default=False)
+
+
+class UserChangesSerializer(serializers.Serializer):
+    since = serializers.CharField(required=False)
+    limit = serializers.IntegerField(
+        min_value=1,
+        max_value=CHANGES_MAX_LIMIT,
+        default=CHANGES_DEFAULT_LIMIT
+    )
+
+
 class UserLoginSerializer(serializers.Serializer):
     email = serializers.EmailField(required=True)
     password = serializers.CharField(
@@ -104,6 +335,19 @@ class UserLoginSerializer(serializers.Serializer):
     )
 
 
+class TokenRefreshRequestSerializer(serializers.Serializer):
+    refresh = serializers.CharField(
+        required=True,
+        error_messages={
+            'required': 'O campo refresh é obrigatório'
+        }
+    )
+
+
+class LogoutSerializer(serializers.Serializer):
+    refresh = serializers.CharField(required=False)
+
+
 class ChangePasswordSerializer(serializers.Serializer):
     old_password = serializers.CharField(
         write_only=True,
@@ -1,12 +1,37 @@
 from django.urls import path
-from .views import UserListCreateView, UserDetailView, UserLoginView
+from .views import (
+    UserListCreateView,
+    UserBulkView,
+    UserBulkDeactivateView,
+    UserBatchView,
+    UserSearchView,
+    UserChangesView,
+    UserDetailView,
+    UserLoginView,
+    UserLogoutView,
+    TokenRefreshView,
+)
 
 app_name = 'users'
 
 urlpatterns = [
     path('', UserListCreateView.as_view(), name='user-list-create'),
     
+    path('bulk/', UserBulkView.as_view(), name='user-bulk'),
+    
+    path('bulk/deactivate/', UserBulkDeactivateView.as_view(), name='user-bulk-deactivate'),
+    
+    path('batch/', UserBatchView.as_view(), name='user-batch'),
+    
+    path('search/', UserSearchView.as_view(), name='user-search'),
+    
+    path('changes/', UserChangesView.as_view(), name='user-changes'),
+    
     path('<int:user_id>/', UserDetailView.as_view(), name='user-detail'),
     
     path('login/', UserLoginView.as_view(), name='user-login'),
+    
+    path('logout/', UserLogoutView.as_view(), name='user-logout'),
+    
+    path('token/refresh/', TokenRefreshView.as_view(), name='token-refresh'),
 ]
\ No newline at end of file
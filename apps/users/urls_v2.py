@@ -0,0 +1,12 @@
+from django.urls import path
+from . import urls as v1
+from .views import UserListCreateV2View
+
+app_name = 'users'
+
+# A v2 herda as rotas da v1 e substitui apenas as que mudaram
+urlpatterns = [
+    path('', UserListCreateV2View.as_view(), name='user-list-create'),
+    
+    *(pattern for pattern in v1.urlpatterns if pattern.name != 'user-list-create'),
+]
@@ -1,45 +1,20 @@
-import re
 from django.core.exceptions import ValidationError
 from django.core.validators import validate_email as django_validate_email
+from core.domains import get_domain_policy
+from core.validation import (
+    EMAIL_PATTERN,
+    NAME_PATTERN,
+    NON_DIGITS,
+    STRICT_RULES,
+    USERNAME_PATTERN,
+)
 
 
 class PasswordValidator:
     
     @staticmethod
     def validate(password):
-        errors = []
-        
-        if len(password) < 8:
-            errors.append("A senha deve ter no mínimo 8 caracteres")
-        
-        if len(password) > 128:
-            errors.append("A senha não pode ter mais de 128 caracteres")
-        
-        if not re.search(r'[A-Z]', password):
-            errors.append("A senha deve conter pelo menos uma letra maiúscula")
-        
-        if not re.search(r'[a-z]', password):
-            errors.append("A senha deve conter pelo menos uma letra minúscula")
-        
-        if not re.search(r'\d', password):
-            errors.append("A senha deve conter pelo menos um número")
-        
-        if not re.search(r'[!@#$%^&*(),.?":{}|<>_\-+=\[\]\\;/~`]', password):
-            errors.append("A senha deve conter pelo menos um caractere especial")
-        
-        common_passwords = [
-            'password', '12345678', 'qwerty', 'abc123', 'password123',
-            '123456789', '12345', '1234567', 'password1', '123456'
-        ]
-        
-        if password.lower() in common_passwords:
-            errors.append("Senha muito comum, escolha uma senha mais segura")
-        
-        if re.search(r'(012|123|234|345|456|567|678|789|890)', password):
-            errors.append("Evite sequências numéricas óbvias")
-        
-        if re.search(r'(abc|bcd|cde|def|efg|fgh|ghi|hij)', password.lower()):
-            errors.append("Evite sequências alfabéticas óbvias")
+        errors = STRICT_RULES.check(password)
         
         if errors:
             raise ValidationError(errors)
@@ -58,19 +33,14 @@ class EmailValidator:
         
         email = email.strip().lower()
         
-        if not re.match(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$', email):
+        if not EMAIL_PATTERN.match(email):
             raise ValidationError("Formato de email inválido")
         
         if len(email) > 255:
             raise ValidationError("Email muito longo")
         
-        disposable_domains = [
-            'tempmail.com', '10minutemail.com', 'guerrillamail.com',
-            'mailinator.com', 'throwaway.email'
-        ]
-        
         domain = email.split('@')[1]
-        if domain in disposable_domains:
+        if get_domain_policy().is_denied(domain):
             raise ValidationError("Emails temporários não são permitidos")
         
         return True
@@ -94,7 +64,7 @@ class NameValidator:
         if ' ' not in name:
             raise ValidationError("Por favor, informe nome e sobrenome")
         
-        if not re.match(r'^[a-zA-ZÀ-ÿ\s\'-]+$', name):
+        if not NAME_PATTERN.match(name):
             raise ValidationError("Nome contém caracteres inválidos")
         
         if not any(c.isalpha() for c in name):
@@ -118,7 +88,7 @@ class UsernameValidator:
         if len(username) > 30:
             raise ValidationError("Username muito longo")
         
-        if not re.match(r'^[a-z0-9_-]+$', username):
+        if not USERNAME_PATTERN.match(username):
             raise ValidationError("Username pode conter apenas letras, números, _ e -")
         
         if username.startswith(('_', '-')) or username.endswith(('_', '-')):
@@ -142,7 +112,7 @@ class PhoneValidator:
         if not phone:
             return True  # Opcional
 
-        phone_digits = re.sub(r'\D', '', phone)
+        phone_digits = NON_DIGITS.sub('', phone)
         
         if len(phone_digits) < 10:
             raise ValidationError("Telefone muito curto")
@@ -193,6 +163,143 @@ def validate_user_data(data, is_update=False):
     return (len(errors) == 0, errors)
 
 
+MISSING = object()
+
+
+class BatchValidator:
+    """
+    Valida uma lista de registros (ou um lote colunar: campo -> lista de
+    valores) campo a campo, percorrendo cada coluna uma única vez. Valores
+    repetidos numa coluna (ex.: senha padrão de uma importação) são validados
+    uma só vez, e campos em `unique` são checados contra duplicatas no lote.
+    
+    Cada validador recebe o valor e retorna o valor limpo, ou levanta
+    ValidationError. Retorna (registros limpos, {linha: {campo: [erros]}}).
+    """
+    
+    def __init__(self, field_validators, required=(), unique=None, missing=None):
+        self.field_validators = field_validators
+        self.required = frozenset(required)
+        self.unique = unique or {}
+        self.missing = missing
+    
+    def validate(self, records):
+        columns, size = self._columns(records)
+        cleaned = [{} for _ in range(size)]
+        errors = {}
+        
+        for field, validator in self.field_validators.items():
+            required = field in self.required
+            column = columns.get(field)
+            if column is None:
+                if not required:
+                    continue
+                column = [MISSING] * size
+            
+            results = {}
+            for index, value in enumerate(column):
+                if value is MISSING:
+                    if not required:
+                        continue
+                    value = self.missing
+                
+                try:
+                    key = (value.__class__, value)
+                    result = results.get(key)
+                except TypeError:
+                    key, result = None, None
+                
+                if result is None:
+                    try:
+                        result = (True, validator(value))
+                    except ValidationError as e:
+                        result = (False, e.messages)
+                    if key is not None:
+                        results[key] = result
+                
+                ok, payload = result
+                if ok:
+                    cleaned[index][field] = payload
+                else:
+                    errors.setdefault(index, {})[field] = payload
+            
+            if field in self.unique:
+                self._check_unique(field, cleaned, errors)
+        
+        return cleaned, errors
+    
+    def _columns(self, records):
+        if isinstance(records, dict):
+            columns = {field: list(values) for field, values in records.items()}
+            sizes = {len(values) for values in columns.values()}
+            if len(sizes) > 1:
+                raise ValueError("Todas as colunas do lote devem ter o mesmo tamanho")
+            return columns, sizes.pop() if sizes else 0
+        
+        rows = list(records)
+        columns = {
+            field: [
+                row.get(field, MISSING) if isinstance(row, dict) else MISSING
+                for row in rows
+            ]
+            for field in self.field_validators
+        }
+        return columns, len(rows)
+    
+    def _check_unique(self, field, cleaned, errors):
+        message = self.unique[field]
+        seen = {}
+        
+        for index, row in enumerate(cleaned):
+            value = row.get(field)
+            if not isinstance(value, str):
+                continue
+            
+            first = seen.setdefault(value.strip().lower(), index)
+            if first != index:
+                errors.setdefault(index, {}).setdefault(field, []).append(
+                    message.format(first=first)
+                )
+
+
+def _returning_value(validator_class):
+    def check(value):
+        validator_class.validate(value)
+        return value
+    return check
+
+
+DUPLICATE_EMAIL_MESSAGE = "Email duplicado no lote (mesmo da linha {first})"
+
+USER_FIELD_VALIDATORS = {
+    'name': _returning_value(NameValidator),
+    'email': _returning_value(EmailValidator),
+    'password': _returning_value(PasswordValidator),
+    'phone': _returning_value(PhoneValidator),
+}
+
+_CREATE_BATCH_VALIDATOR = BatchValidator(
+    USER_FIELD_VALIDATORS,
+    required=('name', 'email'),
+    unique={'email': DUPLICATE_EMAIL_MESSAGE},
+)
+
+_UPDATE_BATCH_VALIDATOR = BatchValidator(
+    USER_FIELD_VALIDATORS,
+    unique={'email': DUPLICATE_EMAIL_MESSAGE},
+)
+
+
+def validate_users_batch(records, is_update=False):
+    """
+    Versão em lote de validate_user_data, com as mesmas regras e mensagens.
+    Retorna (is_valid, {índice da linha: {campo: [erros]}}).
+    """
+    validator = _UPDATE_BATCH_VALIDATOR if is_update else _CREATE_BATCH_VALIDATOR
+    _, errors = validator.validate(records)
+    return (len(errors) == 0, errors)
+
+
 def validate_data(validator_class):
     def decorator(func):
         def wrapper(*args, **kwargs):
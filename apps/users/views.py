@@ -1,23 +1,48 @@
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
-from rest_framework.permissions import AllowAny, IsAuthenticated
-from rest_framework.pagination import PageNumberPagination
-from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework.permissions import AllowAny, IsAdminUser, IsAuthenticated
+from rest_framework.pagination import CursorPagination, PageNumberPagination
 from django_ratelimit.decorators import ratelimit
 from django.utils.decorators import method_decorator
-from django.db import IntegrityError
+from django.views.decorators.cache import never_cache
+from django.db import IntegrityError, transaction
+from django.db.models.functions import Lower
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from rest_framework_simplejwt.tokens import RefreshToken
 
-from .models import User
+from .authentication import has_revoked_tokens, tokens_for_user
+from .cache import get_cached_user, get_cached_users, invalidate_users
+from .changes import list_changes
+from .events import emit_events
+from .idempotency import idempotent
+from .models import User, UserEvent
+from .filters import DEFAULT_ORDERING, filter_users
+from .revocation import get_revocation_list
+from .search import search_users
 from .serializers import (
     UserCreateSerializer,
+    UserBulkCreateSerializer,
     UserUpdateSerializer,
     UserResponseSerializer,
+    USER_RESPONSE_FIELDS,
+    FieldsQuerySerializer,
+    UserListQuerySerializer,
+    UserListV2QuerySerializer,
+    UserBatchSerializer,
+    UserBulkSelectionSerializer,
+    UserBulkUpdateSerializer,
+    UserSearchSerializer,
+    UserChangesSerializer,
     UserLoginSerializer,
+    TokenRefreshRequestSerializer,
+    LogoutSerializer,
     ChangePasswordSerializer,
 )
-from drf_yasg.utils import swagger_auto_schema
+from core.openapi import swagger_auto_schema
 
+import json
 import logging
 
 logger = logging.getLogger(__name__)
@@ -29,27 +54,61 @@ class StandardResultsSetPagination(PageNumberPagination):
     max_page_size = 100
 
 
+class UserCursorPagination(CursorPagination):
+    page_size = 20
+    page_size_query_param = "page_size"
+    max_page_size = 100
+    ordering = DEFAULT_ORDERING
+
+
+@method_decorator(idempotent(), name='dispatch')
 class UserListCreateView(APIView):
     permission_classes = [AllowAny]
+    query_serializer_class = UserListQuerySerializer
+
+    def get_paginator(self, params):
+        return StandardResultsSetPagination()
+
+    def get_value_fields(self, fields, params):
+        return fields
 
     def get_permissions(self):
         if self.request.method == "POST":
             return [AllowAny()]
         return [IsAuthenticated()]
 
-    @swagger_auto_schema(responses={200: UserResponseSerializer(many=True)})
+    @swagger_auto_schema(
+        query_serializer=UserListQuerySerializer,
+        responses={200: UserResponseSerializer(many=True)},
+    )
     @method_decorator(ratelimit(key="ip", rate="100/h", method="GET"))
     def get(self, request):
+        query_serializer = self.query_serializer_class(
+            data=request.query_params.dict(),
+            context={"is_staff": request.user.is_staff},
+        )
+
+        if not query_serializer.is_valid():
+            return Response(
+                {"errors": query_serializer.errors}, status=status.HTTP_400_BAD_REQUEST
+            )
+
+        params = query_serializer.validated_data
+        fields = params.get("fields") or USER_RESPONSE_FIELDS
+
         try:
-            users = User.objects.filter(is_active=True)
-            paginator = StandardResultsSetPagination()
+            # values() lê só as colunas expostas (nunca password/last_login)
+            users = filter_users(User.objects.all(), params).values(
+                *self.get_value_fields(fields, params)
+            )
+            paginator = self.get_paginator(params)
             page = paginator.paginate_queryset(users, request)
 
             if page is not None:
-                serializer = UserResponseSerializer(page, many=True)
+                serializer = UserResponseSerializer(page, many=True, fields=fields)
                 return paginator.get_paginated_response(serializer.data)
 
-            serializer = UserResponseSerializer(users, many=True)
+            serializer = UserResponseSerializer(users, many=True, fields=fields)
             return Response(
                 {"count": users.count(), "results": serializer.data},
                 status=status.HTTP_200_OK,
@@ -75,12 +134,20 @@ class UserListCreateView(APIView):
         validated_data = serializer.validated_data
 
         try:
-            new_user = User.objects.create_user(
-                name=validated_data["name"],
-                email=validated_data["email"],
-                password=validated_data["password"],
-                is_active=True,
-            )
+            with transaction.atomic():
+                new_user = User.objects.create_user_if_absent(
+                    name=validated_data["name"],
+                    email=validated_data["email"],
+                    password=validated_data["password"],
+                    is_active=True,
+                )
+                if new_user is not None:
+                    emit_events(UserEvent.EventType.CREATED, [new_user.id])
+
+            if new_user is None:
+                return Response(
+                    {"error": "Email já cadastrado"}, status=status.HTTP_400_BAD_REQUEST
+                )
 
             response_serializer = UserResponseSerializer(new_user)
             logger.info(f"Usuário criado: {new_user.email}")
@@ -92,18 +159,286 @@ class UserListCreateView(APIView):
                 status=status.HTTP_201_CREATED,
             )
 
-        except IntegrityError:
+        except Exception as e:
+            logger.error(f"Erro ao criar usuário: {e}")
+            return Response(
+                {"error": "Erro ao criar usuário"},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )
+
+
+class UserListCreateV2View(UserListCreateView):
+    """v2: a listagem é paginada por cursor (keyset em ordering, id) por padrão."""
+
+    query_serializer_class = UserListV2QuerySerializer
+
+    def get_paginator(self, params):
+        ordering = params["ordering"]
+        direction = "-" if ordering.startswith("-") else ""
+        paginator = UserCursorPagination()
+        paginator.ordering = (ordering, f"{direction}id")
+        return paginator
+
+    def get_value_fields(self, fields, params):
+        # O cursor é montado a partir do campo de ordenação
+        sort_field = params["ordering"].lstrip("-")
+        return fields if sort_field in fields else (*fields, sort_field)
+
+    @swagger_auto_schema(
+        query_serializer=UserListV2QuerySerializer,
+        responses={200: UserResponseSerializer(many=True)},
+    )
+    def get(self, request):
+        return super().get(request)
+
+
+class UserBulkView(APIView):
+    permission_classes = [IsAdminUser]
+
+    @swagger_auto_schema(request_body=UserBulkCreateSerializer)
+    def post(self, request):
+        serializer = UserBulkCreateSerializer(data=request.data)
+
+        if not serializer.is_valid():
             return Response(
-                {"error": "Email já cadastrado"}, status=status.HTTP_400_BAD_REQUEST
+                {"errors": serializer.errors}, status=status.HTTP_400_BAD_REQUEST
             )
 
+        try:
+            with transaction.atomic():
+                created, conflicts = User.objects.bulk_create_users(
+                    dict(record, is_active=True)
+                    for record in serializer.validated_data["users"]
+                )
+                emit_events(UserEvent.EventType.CREATED, [user.id for user in created])
         except Exception as e:
-            logger.error(f"Erro ao criar usuário: {e}")
+            logger.error(f"Erro ao criar usuários em lote: {e}")
             return Response(
-                {"error": "Erro ao criar usuário"},
+                {"error": "Erro ao criar usuários"},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR,
             )
 
+        logger.info(f"Usuários criados em lote: {len(created)} ({len(conflicts)} conflitos)")
+        return Response(
+            {
+                "created": len(created),
+                "users": UserResponseSerializer(created, many=True).data,
+                "conflicts": conflicts,
+            },
+            status=status.HTTP_201_CREATED,
+        )
+
+    @swagger_auto_schema(request_body=UserBulkUpdateSerializer)
+    def patch(self, request):
+        serializer = UserBulkUpdateSerializer(data=request.data)
+
+        if not serializer.is_valid():
+            return Response(
+                {"errors": serializer.errors}, status=status.HTTP_400_BAD_REQUEST
+            )
+
+        changes = serializer.validated_data["changes"]
+        try:
+            affected = bulk_update_users(serializer.validated_data, changes)
+        except Exception as e:
+            logger.error(f"Erro ao atualizar usuários em lote: {e}")
+            return Response(
+                {"error": "Erro ao atualizar usuários"},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )
+
+        logger.info(f"Usuários atualizados em lote: {len(affected)} ({changes})")
+        return Response({"affected": len(affected)}, status=status.HTTP_200_OK)
+
+
+class UserBulkDeactivateView(APIView):
+    permission_classes = [IsAdminUser]
+
+    @swagger_auto_schema(
+        request_body=UserBulkSelectionSerializer,
+        responses={200: '{"affected": 0}'},
+    )
+    def post(self, request):
+        serializer = UserBulkSelectionSerializer(data=request.data)
+
+        if not serializer.is_valid():
+            return Response(
+                {"errors": serializer.errors}, status=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            affected = bulk_update_users(serializer.validated_data, {"is_active": False})
+        except Exception as e:
+            logger.error(f"Erro ao desativar usuários em lote: {e}")
+            return Response(
+                {"error": "Erro ao desativar usuários"},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )
+
+        logger.info(f"Usuários desativados em lote: {len(affected)}")
+        return Response({"affected": len(affected)}, status=status.HTTP_200_OK)
+
+
+def bulk_update_users(selection, changes):
+    """
+    Um único UPDATE para toda a seleção (só linhas que realmente mudam),
+    seguido de invalidação de cache e eventos em lote na mesma transação.
+    """
+    if "ids" in selection:
+        queryset = User.objects.filter(id__any=selection["ids"])
+    else:
+        queryset = filter_users(User.objects.all(), selection["filter"], active_by_default=False)
+
+    with transaction.atomic():
+        affected = User.objects.update_returning_ids(
+            queryset.exclude(**changes), **changes
+        )
+
+        event_type = (
+            UserEvent.EventType.DEACTIVATED
+            if changes == {"is_active": False}
+            else UserEvent.EventType.UPDATED
+        )
+        emit_events(event_type, affected, payload=changes)
+        transaction.on_commit(lambda: invalidate_users(affected))
+
+    return affected
+
+
+class UserBatchView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    @swagger_auto_schema(
+        query_serializer=FieldsQuerySerializer,
+        responses={200: UserResponseSerializer(many=True)},
+    )
+    def get(self, request):
+        data = request.query_params.dict()
+        data["ids"] = [i for i in data.get("ids", "").split(",") if i.strip()]
+        return self.lookup(request, data)
+
+    @swagger_auto_schema(
+        request_body=UserBatchSerializer,
+        responses={200: UserResponseSerializer(many=True)},
+    )
+    def post(self, request):
+        return self.lookup(request, request.data)
+
+    def lookup(self, request, data):
+        serializer = UserBatchSerializer(data=data)
+
+        if not serializer.is_valid():
+            return Response(
+                {"errors": serializer.errors}, status=status.HTTP_400_BAD_REQUEST
+            )
+
+        params = serializer.validated_data
+        fields = params.get("fields") or USER_RESPONSE_FIELDS
+
+        if params.get("ids"):
+            keys = list(dict.fromkeys(params["ids"]))
+            found = get_cached_users(keys)
+        else:
+            keys = list(dict.fromkeys(email.lower() for email in params["emails"]))
+            found = {
+                user.email.lower(): user
+                for user in User.objects.alias(email_lower=Lower("email")).filter(
+                    email_lower__any=keys
+                )
+            }
+
+        # Mesmas regras de visibilidade do UserDetailView.get_object
+        visible = [
+            key
+            for key in keys
+            if key in found and (found[key].is_active or request.user.is_staff)
+        ]
+        users = [found[key] for key in visible]
+        visible = set(visible)
+        missing = [key for key in keys if key not in visible]
+
+        return Response(
+            {
+                "results": UserResponseSerializer(users, many=True, fields=fields).data,
+                "missing": missing,
+            },
+            status=status.HTTP_200_OK,
+        )
+
+
+class UserSearchView(APIView):
+    permission_classes = [IsAdminUser]
+
+    @swagger_auto_schema(
+        query_serializer=UserSearchSerializer,
+        responses={200: UserResponseSerializer(many=True)},
+    )
+    def get(self, request):
+        serializer = UserSearchSerializer(data=request.query_params)
+
+        if not serializer.is_valid():
+            return Response(
+                {"errors": serializer.errors}, status=status.HTTP_400_BAD_REQUEST
+            )
+
+        params = serializer.validated_data
+        try:
+            users, next_cursor = search_users(
+                params["q"],
+                limit=params["limit"],
+                cursor=params.get("cursor"),
+                unaccent=params["unaccent"],
+            )
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response(
+            {
+                "results": UserResponseSerializer(users, many=True).data,
+                "next_cursor": next_cursor,
+            },
+            status=status.HTTP_200_OK,
+        )
+
+
+class UserChangesView(APIView):
+    """Feed incremental para réplicas do diretório de usuários."""
+
+    permission_classes = [IsAdminUser]
+
+    @swagger_auto_schema(
+        query_serializer=UserChangesSerializer,
+        responses={200: '{"results": [...], "deleted": [{"id": 0, "deleted_at": "..."}], "next_cursor": "...", "has_more": false}'},
+    )
+    def get(self, request):
+        serializer = UserChangesSerializer(data=request.query_params)
+
+        if not serializer.is_valid():
+            return Response(
+                {"errors": serializer.errors}, status=status.HTTP_400_BAD_REQUEST
+            )
+
+        params = serializer.validated_data
+        try:
+            users, deleted, next_cursor, has_more = list_changes(
+                params.get("since"), limit=params["limit"]
+            )
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response(
+            {
+                "results": UserResponseSerializer(users, many=True).data,
+                "deleted": [
+                    {"id": event.user_id, "deleted_at": event.created_at}
+                    for event in deleted
+                ],
+                "next_cursor": next_cursor,
+                "has_more": has_more,
+            },
+            status=status.HTTP_200_OK,
+        )
+
 
 class UserDetailView(APIView):
     permission_classes = [IsAuthenticated]
@@ -118,16 +453,39 @@ class UserDetailView(APIView):
         except User.DoesNotExist:
             return None
 
-    @swagger_auto_schema(responses={200: UserResponseSerializer})
+    def get_cached_object(self, user_id, request_user):
+        # Leitura via cache de usuários; escritas continuam usando get_object.
+        # Sem .only(): a entrada do cache guarda o usuário completo para servir
+        # qualquer ?fields=; um objeto parcial não poderia ser reaproveitado e
+        # a falta de cache custa uma única leitura por chave primária.
+        user = get_cached_user(user_id)
+
+        if user is None or not (user.is_active or request_user.is_staff):
+            return None
+
+        return user
+
+    @swagger_auto_schema(
+        query_serializer=FieldsQuerySerializer,
+        responses={200: UserResponseSerializer},
+    )
     def get(self, request, user_id):
-        user = self.get_object(user_id, request.user)
+        query_serializer = FieldsQuerySerializer(data=request.query_params.dict())
+
+        if not query_serializer.is_valid():
+            return Response(
+                {"errors": query_serializer.errors}, status=status.HTTP_400_BAD_REQUEST
+            )
+
+        fields = query_serializer.validated_data.get("fields") or USER_RESPONSE_FIELDS
+        user = self.get_cached_object(user_id, request.user)
 
         if not user:
             return Response(
                 {"error": "Usuário não encontrado"}, status=status.HTTP_404_NOT_FOUND
             )
 
-        serializer = UserResponseSerializer(user)
+        serializer = UserResponseSerializer(user, fields=fields)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
     @swagger_auto_schema(request_body=UserUpdateSerializer)
@@ -160,7 +518,10 @@ class UserDetailView(APIView):
             if "password" in validated_data:
                 user.set_password(validated_data["password"])
 
-            user.save()
+            # UPDATE não tem ON CONFLICT: o savepoint isola a violação de unicidade
+            with transaction.atomic():
+                user.save()
+                emit_events(UserEvent.EventType.UPDATED, [user.id])
 
             response_serializer = UserResponseSerializer(user)
             logger.info(f"Usuário atualizado: {user.email}")
@@ -203,8 +564,10 @@ class UserDetailView(APIView):
                 status=status.HTTP_404_NOT_FOUND,
             )
 
-        user.is_active = False
-        user.save(update_fields=["is_active"])
+        with transaction.atomic():
+            user.is_active = False
+            user.save(update_fields=["is_active", "updated_at"])
+            emit_events(UserEvent.EventType.DEACTIVATED, [user.id])
 
         logger.info(f"Usuário desativado: {user.email}")
         return Response(
@@ -212,6 +575,20 @@ class UserDetailView(APIView):
         )
 
 
+def _login_replayable(stored):
+    # Não repete tokens já revogados (logout ou rotação do refresh)
+    if stored['status'] != status.HTTP_200_OK:
+        return True
+
+    return not has_revoked_tokens(json.loads(stored['body']))
+
+
+# Tokens na resposta: no-store/private, que também desliga a compressão (BREACH)
+@method_decorator(never_cache, name='dispatch')
+@method_decorator(
+    idempotent(ttl_setting='IDEMPOTENCY_LOGIN_TTL', replayable=_login_replayable),
+    name='dispatch',
+)
 class UserLoginView(APIView):
     permission_classes = [AllowAny]
 
@@ -230,7 +607,7 @@ class UserLoginView(APIView):
 
         validated_data = serializer.validated_data
         try:
-            user = User.objects.get(email=validated_data["email"])
+            user = User.objects.get_by_email(validated_data["email"])
 
             if (
                 not user.check_password(validated_data["password"])
@@ -241,7 +618,7 @@ class UserLoginView(APIView):
                     status=status.HTTP_401_UNAUTHORIZED,
                 )
 
-            refresh = RefreshToken.for_user(user)
+            refresh = tokens_for_user(user)
 
             response_serializer = UserResponseSerializer(user)
             logger.info(f"Login bem-sucedido: {user.email}")
@@ -266,3 +643,95 @@ class UserLoginView(APIView):
                 {"error": "Erro ao realizar login"},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR,
             )
+
+
+@method_decorator(never_cache, name='dispatch')
+class TokenRefreshView(APIView):
+    permission_classes = [AllowAny]
+
+    @swagger_auto_schema(
+        request_body=TokenRefreshRequestSerializer,
+        responses={200: "{'access': '...', 'refresh': '...'}"},
+    )
+    @method_decorator(ratelimit(key="ip", rate="30/m", method="POST"))
+    def post(self, request):
+        serializer = TokenRefreshRequestSerializer(data=request.data)
+
+        if not serializer.is_valid():
+            return Response(
+                {"errors": serializer.errors}, status=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            refresh = RefreshToken(serializer.validated_data["refresh"])
+        except TokenError:
+            return Response(
+                {"error": "Token inválido ou expirado"},
+                status=status.HTTP_401_UNAUTHORIZED,
+            )
+
+        revocation = get_revocation_list()
+        jti = refresh[jwt_settings.JTI_CLAIM]
+
+        if revocation.is_revoked(jti):
+            return Response(
+                {"error": "Token revogado"}, status=status.HTTP_401_UNAUTHORIZED
+            )
+
+        user = get_cached_user(refresh[jwt_settings.USER_ID_CLAIM])
+        if user is None or not user.is_active:
+            return Response(
+                {"error": "Credenciais inválidas"}, status=status.HTTP_401_UNAUTHORIZED
+            )
+
+        new_refresh = tokens_for_user(user)
+        data = {"access": str(new_refresh.access_token)}
+
+        if jwt_settings.ROTATE_REFRESH_TOKENS:
+            revocation.revoke(jti, refresh["exp"])
+            data["refresh"] = str(new_refresh)
+
+        return Response(data, status=status.HTTP_200_OK)
+
+
+class UserLogoutView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    @swagger_auto_schema(
+        request_body=LogoutSerializer,
+        responses={200: '{"message": "Logout realizado com sucesso"}'},
+    )
+    def post(self, request):
+        serializer = LogoutSerializer(data=request.data)
+
+        if not serializer.is_valid():
+            return Response(
+                {"errors": serializer.errors}, status=status.HTTP_400_BAD_REQUEST
+            )
+
+        refresh = None
+        if serializer.validated_data.get("refresh"):
+            try:
+                refresh = RefreshToken(serializer.validated_data["refresh"])
+            except TokenError:
+                return Response(
+                    {"error": "Refresh token inválido ou expirado"},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+
+            if refresh[jwt_settings.USER_ID_CLAIM] != request.user.id:
+                return Response(
+                    {"error": "Refresh token não pertence a este usuário."},
+                    status=status.HTTP_403_FORBIDDEN,
+                )
+
+        revocation = get_revocation_list()
+        revocation.revoke(request.auth[jwt_settings.JTI_CLAIM], request.auth["exp"])
+
+        if refresh is not None:
+            revocation.revoke(refresh[jwt_settings.JTI_CLAIM], refresh["exp"])
+
+        logger.info(f"Logout: usuário {request.user.id}")
+        return Response(
+            {"message": "Logout realizado com sucesso"}, status=status.HTTP_200_OK
+        )
@@ -0,0 +1,357 @@
+"""
+Webhooks dos eventos de ciclo de vida do usuário.
+
+O outbox (UserEvent) é lido por assinatura, em ordem de transação (txid, id)
+e só com transações já terminadas, e agrupado em lotes (WebhookDelivery), um POST assinado por lote. O envio usa
+um pool de conexões keep-alive por destino (esquema, host, porta) com no
+máximo WEBHOOK_MAX_CONNECTIONS_PER_HOST requisições simultâneas. Falhas
+transitórias são refeitas com backoff exponencial; esgotadas as tentativas,
+ou com uma resposta 4xx definitiva, o lote fica como `dead` até ser reenfileirado.
+
+A entrega é at-least-once: o receptor deve descartar repetições pelo
+X-Webhook-Id ou pelo id de cada evento.
+"""
+import hashlib
+import hmac
+import http.client
+import json
+import logging
+import math
+import queue
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from itertools import chain, zip_longest
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from .changes import visible_txid_bound
+
+logger = logging.getLogger(__name__)
+
+SIGNATURE_HEADER = 'X-Webhook-Signature'
+TIMESTAMP_HEADER = 'X-Webhook-Timestamp'
+DELIVERY_HEADER = 'X-Webhook-Id'
+ATTEMPT_HEADER = 'X-Webhook-Attempt'
+USER_AGENT = 'users-api-webhooks/1.0'
+
+# As demais respostas 4xx não mudam com nova tentativa e vão direto para `dead`
+RETRYABLE_STATUSES = {408, 425, 429}
+
+STALE_CONNECTION_ERRORS = (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError)
+
+
+def sign(secret, timestamp, body):
+    mac = hmac.new(secret.encode(), f'{timestamp}.'.encode() + body, hashlib.sha256)
+    return f'sha256={mac.hexdigest()}'
+
+
+def verify_signature(secret, timestamp, body, signature, tolerance=300):
+    """Lado do receptor: confere a assinatura e recusa timestamps fora da janela."""
+    try:
+        if abs(time.time() - int(timestamp)) > tolerance:
+            return False
+    except (TypeError, ValueError):
+        return False
+    return hmac.compare_digest(sign(secret, timestamp, body), signature or '')
+
+
+class DestinationPool:
+    """Conexões keep-alive para uma origem, com no máximo `size` requisições ao mesmo tempo."""
+
+    def __init__(self, scheme, netloc, size, timeout):
+        self.scheme = scheme
+        self.netloc = netloc
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(size)
+        self._idle = queue.LifoQueue()
+
+    def _connect(self):
+        connection_class = (
+            http.client.HTTPSConnection if self.scheme == 'https' else http.client.HTTPConnection
+        )
+        return connection_class(self.netloc, timeout=self.timeout)
+
+    def _send(self, connection, path, body, headers):
+        connection.request('POST', path, body=body, headers=headers)
+        response = connection.getresponse()
+        response.read()
+        return response
+
+    def post(self, path, body, headers):
+        """Retorna a resposta já lida. Erros de rede sobem como OSError/HTTPException."""
+        with self._slots:
+            try:
+                connection, reused = self._idle.get_nowait(), True
+            except queue.Empty:
+                connection, reused = self._connect(), False
+
+            try:
+                try:
+                    response = self._send(connection, path, body, headers)
+                except STALE_CONNECTION_ERRORS:
+                    # Conexão ociosa que o destino já fechou: refaz uma vez numa nova
+                    if not reused:
+                        raise
+                    connection.close()
+                    connection = self._connect()
+                    response = self._send(connection, path, body, headers)
+            except BaseException:
+                connection.close()
+                raise
+
+            if response.will_close:
+                connection.close()
+            else:
+                self._idle.put(connection)
+
+            return response
+
+    def close(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(url):
+    parts = urlsplit(url)
+    key = (parts.scheme, parts.netloc)
+
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = _pools[key] = DestinationPool(
+                parts.scheme, parts.netloc,
+                settings.WEBHOOK_MAX_CONNECTIONS_PER_HOST, settings.WEBHOOK_TIMEOUT,
+            )
+
+    return pool
+
+
+def subscribe(url, event_types=()):
+    """Cria uma assinatura que recebe só os eventos confirmados a partir de agora."""
+    from .models import UserEvent, WebhookSubscription
+
+    unknown = set(event_types) - set(UserEvent.EventType.values)
+    if unknown:
+        raise ValueError(f"Tipos de evento desconhecidos: {', '.join(sorted(unknown))}")
+
+    latest = (
+        UserEvent.objects
+        .filter(txid__lt=visible_txid_bound())
+        .order_by('-txid', '-id')
+        .values_list('txid', 'id')
+        .first()
+    ) or (0, 0)
+    return WebhookSubscription.objects.create(
+        url=url, event_types=list(event_types),
+        last_event_txid=latest[0], last_event_id=latest[1],
+    )
+
+
+def serialize_event(event):
+    return {
+        'id': event.id,
+        'type': event.event_type,
+        'user_id': event.user_id,
+        'data': event.payload,
+        'created_at': event.created_at.isoformat(),
+    }
+
+
+def dispatch_events():
+    """Agrupa os eventos novos do outbox, um lote por assinatura ativa. Retorna quantos lotes criou."""
+    from .models import UserEvent, WebhookDelivery, WebhookSubscription
+
+    # Mesmo limite do feed de alterações: o outbox é lido em (txid, id) só até a
+    # transação mais antiga ainda aberta, então um commit atrasado nunca fica
+    # para trás do cursor. Lido antes do select_for_update, que abre uma transação.
+    bound = visible_txid_bound()
+    deliveries, advanced, fetched = [], [], {}
+
+    with transaction.atomic():
+        subscriptions = list(
+            WebhookSubscription.objects.filter(is_active=True).select_for_update(skip_locked=True)
+        )
+        pending = dict(
+            WebhookDelivery.objects
+            .filter(subscription__in=subscriptions, status=WebhookDelivery.Status.PENDING)
+            .values_list('subscription')
+            .annotate(Count('id'))
+            .order_by()
+        )
+
+        for subscription in subscriptions:
+            # Destino fora do ar: os eventos esperam no outbox em vez de virar lotes
+            if pending.get(subscription.id, 0) >= settings.WEBHOOK_MAX_PENDING_BATCHES:
+                continue
+
+            cursor = (subscription.last_event_txid, subscription.last_event_id)
+            if cursor not in fetched:
+                fetched[cursor] = list(
+                    UserEvent.objects
+                    .filter(txid__lt=bound)
+                    .filter(Q(txid__gt=cursor[0]) | Q(txid=cursor[0], id__gt=cursor[1]))
+                    .order_by('txid', 'id')[:settings.WEBHOOK_BATCH_SIZE]
+                )
+            events = fetched[cursor]
+            if not events:
+                continue
+
+            matched = [serialize_event(e) for e in events if subscription.accepts(e.event_type)]
+            if matched:
+                deliveries.append(WebhookDelivery(subscription=subscription, events=matched))
+
+            subscription.last_event_txid, subscription.last_event_id = events[-1].txid, events[-1].id
+            advanced.append(subscription)
+
+        WebhookDelivery.objects.bulk_create(deliveries)
+        WebhookSubscription.objects.bulk_update(advanced, ['last_event_txid', 'last_event_id'])
+
+    return len(deliveries)
+
+
+def _claim_due(limit):
+    from .models import WebhookDelivery
+
+    now = timezone.now()
+    with transaction.atomic():
+        due = list(
+            WebhookDelivery.objects
+            .select_related('subscription')
+            .filter(status=WebhookDelivery.Status.PENDING, next_attempt_at__lte=now)
+            .order_by('next_attempt_at')
+            .select_for_update(skip_locked=True, of=('self',))[:limit]
+        )
+        if due:
+            # Prazo do envio no pior caso (todos no mesmo destino); vencido, outro worker retoma o lote
+            rounds = math.ceil(len(due) / settings.WEBHOOK_MAX_CONNECTIONS_PER_HOST) + 1
+            lease = now + timedelta(seconds=settings.WEBHOOK_TIMEOUT * rounds * 2)
+            WebhookDelivery.objects.filter(id__in=[d.id for d in due]).update(next_attempt_at=lease)
+
+    return due
+
+
+def _interleave_by_destination(deliveries):
+    # Um destino lento não ocupa todas as threads enquanto os outros esperam na fila
+    groups = {}
+    for delivery in deliveries:
+        parts = urlsplit(delivery.subscription.url)
+        groups.setdefault((parts.scheme, parts.netloc), []).append(delivery)
+    return [d for d in chain.from_iterable(zip_longest(*groups.values())) if d is not None]
+
+
+def _post(delivery):
+    """Envia um lote. Retorna (status HTTP ou None, Retry-After, erro). Não acessa o banco."""
+    subscription = delivery.subscription
+    body = json.dumps({'id': delivery.id, 'events': delivery.events}, separators=(',', ':')).encode()
+    timestamp = str(int(time.time()))
+
+    parts = urlsplit(subscription.url)
+    path = (parts.path or '/') + (f'?{parts.query}' if parts.query else '')
+    headers = {
+        'Content-Type': 'application/json',
+        'User-Agent': USER_AGENT,
+        DELIVERY_HEADER: str(delivery.id),
+        ATTEMPT_HEADER: str(delivery.attempts + 1),
+        TIMESTAMP_HEADER: timestamp,
+        SIGNATURE_HEADER: sign(subscription.secret, timestamp, body),
+    }
+
+    try:
+        response = get_pool(subscription.url).post(path, body, headers)
+    except (OSError, http.client.HTTPException) as e:
+        return None, None, f"{type(e).__name__}: {e}"
+
+    return response.status, response.getheader('Retry-After'), ''
+
+
+def retry_delay(attempts, retry_after=None):
+    """Backoff exponencial com jitter; um Retry-After maior (em segundos) prevalece."""
+    delay = min(
+        settings.WEBHOOK_RETRY_MAX_DELAY,
+        settings.WEBHOOK_RETRY_BASE_DELAY * 2 ** (attempts - 1),
+    )
+    delay = random.uniform(delay / 2, delay)
+
+    try:
+        delay = max(delay, min(float(retry_after), settings.WEBHOOK_RETRY_MAX_DELAY))
+    except (TypeError, ValueError):
+        pass
+
+    return delay
+
+
+def send_due_deliveries(limit=None):
+    """Envia os lotes vencidos. Retorna (entregues, reagendados, descartados)."""
+    from .models import WebhookDelivery
+
+    due = _claim_due(limit or settings.WEBHOOK_SEND_LIMIT)
+    if not due:
+        return 0, 0, 0
+
+    due = _interleave_by_destination(due)
+    with ThreadPoolExecutor(max_workers=min(len(due), settings.WEBHOOK_MAX_WORKERS)) as executor:
+        results = list(executor.map(_post, due))
+
+    now = timezone.now()
+    delivered, failed, dead = [], [], 0
+
+    for delivery, (status_code, retry_after, error) in zip(due, results):
+        if status_code is not None and 200 <= status_code < 300:
+            delivered.append(delivery.id)
+            continue
+
+        delivery.attempts += 1
+        delivery.last_status_code = status_code
+        delivery.last_error = (error or f"HTTP {status_code}")[:500]
+
+        retryable = status_code is None or status_code >= 500 or status_code in RETRYABLE_STATUSES
+        if retryable and delivery.attempts < settings.WEBHOOK_MAX_ATTEMPTS:
+            delivery.next_attempt_at = now + timedelta(seconds=retry_delay(delivery.attempts, retry_after))
+        else:
+            delivery.status = WebhookDelivery.Status.DEAD
+            dead += 1
+            logger.warning(
+                f"Webhook {delivery.id} para {delivery.subscription.url} descartado "
+                f"após {delivery.attempts} tentativa(s): {delivery.last_error}"
+            )
+        failed.append(delivery)
+
+    WebhookDelivery.objects.filter(id__in=delivered).delete()
+    WebhookDelivery.objects.bulk_update(
+        failed, ['attempts', 'status', 'next_attempt_at', 'last_status_code', 'last_error']
+    )
+
+    return len(delivered), len(failed) - dead, dead
+
+
+def deliver_webhooks():
+    batched = dispatch_events()
+    delivered, retried, dead = send_due_deliveries()
+    return {'batched': batched, 'delivered': delivered, 'retried': retried, 'dead': dead}
+
+
+def requeue_dead(subscription_id=None):
+    """Devolve os lotes descartados à fila, com as tentativas zeradas."""
+    from .models import WebhookDelivery
+
+    deliveries = WebhookDelivery.objects.filter(status=WebhookDelivery.Status.DEAD)
+    if subscription_id is not None:
+        deliveries = deliveries.filter(subscription_id=subscription_id)
+
+    return deliveries.update(
+        status=WebhookDelivery.Status.PENDING, attempts=0, next_attempt_at=timezone.now()
+    )
@@ -0,0 +1,71 @@
+"""
+Custo de autenticação por requisição, com e sem a checagem de revogação.
+
+Uso: python -m benchmarks.bench_auth [--iterations N] [--revoked N]
+"""
+import argparse
+import os
+import time
+import timeit
+import uuid
+
+
+def measure(func, iterations):
+    return min(timeit.repeat(func, number=iterations, repeat=5)) / iterations * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--iterations', type=int, default=20000)
+    parser.add_argument('--revoked', type=int, default=10000)
+    args = parser.parse_args()
+
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+    import django
+    django.setup()
+
+    from django.conf import settings
+    from django.test import RequestFactory
+    from rest_framework_simplejwt.authentication import JWTStatelessUserAuthentication
+    from rest_framework_simplejwt.exceptions import InvalidToken
+
+    from apps.users.authentication import CachedJWTAuthentication, tokens_for_user
+    from apps.users.models import User
+    from apps.users.revocation import get_revocation_list
+
+    settings.JWT_STATELESS_AUTH = True
+
+    user = User(id=1, email='bench@example.com', name='Bench User')
+    access = tokens_for_user(user).access_token
+    request = RequestFactory().get('/api/users/', HTTP_AUTHORIZATION=f'Bearer {access}')
+
+    revocation = get_revocation_list()
+    expires_at = time.time() + 3600
+    for _ in range(args.revoked):
+        revocation.revoke(uuid.uuid4().hex, expires_at)
+
+    baseline = JWTStatelessUserAuthentication()
+    cached = CachedJWTAuthentication()
+
+    def revoked_request():
+        try:
+            cached.authenticate(request)
+        except InvalidToken:
+            pass
+
+    results = [
+        ('simplejwt stateless (sem revogação)', measure(lambda: baseline.authenticate(request), args.iterations)),
+        ('stateless + filtro (token válido)', measure(lambda: cached.authenticate(request), args.iterations)),
+        ('lookup no filtro de Bloom', measure(lambda: access['jti'] in revocation._filter, args.iterations)),
+    ]
+
+    revocation.revoke(access['jti'], expires_at)
+    results.append(('stateless + filtro (token revogado)', measure(revoked_request, args.iterations)))
+
+    print(f'{args.revoked} tokens revogados, {args.iterations} iterações')
+    for name, micros in results:
+        print(f'{name:<40} {micros:8.2f} µs/req')
+
+
+if __name__ == '__main__':
+    main()
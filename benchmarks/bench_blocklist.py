@@ -0,0 +1,72 @@
+"""
+Blocklist de senhas com um corpus sintético no formato do Have I Been Pwned.
+
+Mede a geração do arquivo, o tempo de abertura, o RSS adicional do processo
+e o custo de uma consulta.
+
+Uso: python -m benchmarks.bench_blocklist [--entries N] [--lookups N]
+"""
+import argparse
+import hashlib
+import os
+import tempfile
+import time
+import timeit
+
+
+def memory_kib():
+    """RssAnon/RssFile do processo (Linux); páginas do mmap contam como RssFile."""
+    try:
+        with open('/proc/self/status') as f:
+            fields = dict(line.split(':', 1) for line in f)
+    except OSError:
+        return 0, 0
+    return int(fields['RssAnon'].split()[0]), int(fields['RssFile'].split()[0])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--entries', type=int, default=5_000_000)
+    parser.add_argument('--lookups', type=int, default=100_000)
+    args = parser.parse_args()
+
+    from core.blocklist import PasswordBlocklist, build_blocklist
+
+    with tempfile.TemporaryDirectory() as directory:
+        source = os.path.join(directory, 'pwned.txt')
+        with open(source, 'w') as f:
+            for i in range(args.entries):
+                f.write(f'{hashlib.sha1(f"senha{i}".encode()).hexdigest().upper()}:{i % 100 + 1}\n')
+
+        output = os.path.join(directory, 'blocklist.bin')
+        start = time.perf_counter()
+        count = build_blocklist([source], output)
+        build_seconds = time.perf_counter() - start
+
+        anon_before, file_before = memory_kib()
+        start = time.perf_counter()
+        blocklist = PasswordBlocklist(output)
+        open_ms = (time.perf_counter() - start) * 1e3
+
+        hits = [f'senha{i}' for i in range(0, args.entries, max(1, args.entries // 1000))]
+        misses = [f'Outra{i}!' for i in range(1000)]
+        assert all(password in blocklist for password in hits)
+
+        lookups = max(1, args.lookups // (len(hits) + len(misses)))
+        seconds = min(timeit.repeat(
+            lambda: [password in blocklist for password in hits + misses],
+            number=lookups, repeat=3,
+        ))
+        per_lookup = seconds / (lookups * (len(hits) + len(misses))) * 1e6
+        anon_after, file_after = memory_kib()
+
+        print(f'{count} registros, arquivo de {os.path.getsize(output) / 2**20:.1f} MiB')
+        print(f'geração                {build_seconds:8.2f} s')
+        print(f'abertura (mmap)        {open_ms:8.3f} ms')
+        print(f'consulta               {per_lookup:8.2f} µs')
+        print(f'RSS privado adicional  {(anon_after - anon_before) / 1024:8.1f} MiB')
+        print(f'RSS compartilhado      {(file_after - file_before) / 1024:8.1f} MiB (page cache do arquivo)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+"""
+Política de domínios de email com listas grandes.
+
+Gera uma lista sintética de domínios bloqueados (mais curingas e exceções),
+mede a carga a partir do arquivo e o custo por consulta, comparando com a
+busca linear em lista usada antes.
+
+Uso: python -m benchmarks.bench_domains [--domains N] [--iterations N]
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+import timeit
+
+
+def measure(func, iterations):
+    return min(timeit.repeat(func, number=iterations, repeat=5)) / iterations * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--domains', type=int, default=100_000)
+    parser.add_argument('--iterations', type=int, default=20000)
+    args = parser.parse_args()
+
+    from core.domains import DomainPolicy, DomainPolicyStore
+
+    random.seed(42)
+    tlds = ['com', 'net', 'org', 'io', 'email', 'com.br']
+    domains = [f'temp{i}mail.{random.choice(tlds)}' for i in range(args.domains)]
+
+    with tempfile.TemporaryDirectory() as directory:
+        deny_path = os.path.join(directory, 'deny.txt')
+        allow_path = os.path.join(directory, 'allow.txt')
+
+        with open(deny_path, 'w') as f:
+            f.write('\n'.join(domains))
+            f.write('\n' + '\n'.join(f'*.wild{i}.net' for i in range(args.domains // 20)))
+        with open(allow_path, 'w') as f:
+            f.write('\n'.join(f'corp.{domain}' for domain in domains[:100]))
+
+        start = time.perf_counter()
+        policy = DomainPolicy.from_files(deny_path, allow_path)
+        load_ms = (time.perf_counter() - start) * 1e3
+
+        store = DomainPolicyStore(deny_path, allow_path, check_interval=30)
+        store.get()
+
+        legacy = list(domains)
+        cases = [
+            ('bloqueado (exato)', domains[args.domains // 2]),
+            ('bloqueado (subdomínio)', f'a.b.{domains[-1]}'),
+            ('bloqueado (curinga)', 'x.wild7.net'),
+            ('permitido (exceção)', f'corp.{domains[0]}'),
+            ('não listado', 'gmail.com'),
+        ]
+
+        print(f'{len(policy)} regras, carga do arquivo em {load_ms:.1f} ms')
+        for name, domain in cases:
+            micros = measure(lambda: policy.is_denied(domain), args.iterations)
+            print(f'{name:<24} {micros:8.3f} µs')
+
+        print(f'{"store.get() + consulta":<24} {measure(lambda: store.get().is_denied("gmail.com"), args.iterations):8.3f} µs')
+        print(f'{"lista linear (antes)":<24} {measure(lambda: "gmail.com" in legacy, 200):8.1f} µs')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,151 @@
+"""
+Microbenchmarks dos caminhos quentes da API.
+
+Uso:
+    pytest benchmarks/bench_hot_paths.py --benchmark-json=.benchmarks/atual.json
+    python -m benchmarks.compare .benchmarks/base.json .benchmarks/atual.json
+
+Com --benchmark-autosave os resultados ficam em .benchmarks/ e podem ser
+comparados na própria execução com --benchmark-compare --benchmark-compare-fail=median:10%.
+"""
+from datetime import timedelta
+
+import pytest
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.http import JsonResponse
+from django.test import RequestFactory
+from django.utils import timezone
+from django.utils.module_loading import import_string
+from rest_framework import exceptions
+from rest_framework.request import Request
+
+from apps.users.models import User
+from apps.users.serializers import USER_RESPONSE_FIELDS, UserResponseSerializer
+from apps.users.validators import validate_user_data
+from core.security import PasswordSecurity
+
+PAGE_SIZES = [1, 20, 100]
+
+MIDDLEWARE_CLASSES = [
+    'core.middleware.RequestLoggingMiddleware',
+    'core.middleware.SecurityHeadersMiddleware',
+    'core.middleware.APIVersionMiddleware',
+    'core.middleware.JSONRequestMiddleware',
+    'core.middleware.CORSMiddleware',
+    'core.middleware.RequestIDMiddleware',
+    'core.middleware.MaintenanceModeMiddleware',
+    'core.middleware.RateLimitMiddleware',
+    'core.middleware.APIFastPathMiddleware',
+    'core.middleware.CompressionMiddleware',
+    'core.middleware.UserActivityMiddleware',
+]
+
+PASSWORD = 'SenhaForte123!'
+
+
+def make_users(count):
+    now = timezone.now()
+    return [
+        User(
+            id=i, name=f'Usuário {i} Silva', email=f'user{i}@example.com',
+            is_active=True, created_at=now, updated_at=now,
+        )
+        for i in range(1, count + 1)
+    ]
+
+
+@pytest.fixture(scope='module')
+def factory():
+    return RequestFactory(HTTP_HOST='localhost')
+
+
+@pytest.fixture(scope='module')
+def password_hash():
+    return PasswordSecurity.hash_password(PASSWORD)
+
+
+@pytest.mark.parametrize('page_size', PAGE_SIZES)
+def test_user_response_serializer_instances(benchmark, page_size):
+    users = make_users(page_size)
+    benchmark(lambda: UserResponseSerializer(users, many=True).data)
+
+
+@pytest.mark.parametrize('page_size', PAGE_SIZES)
+def test_user_response_serializer_values(benchmark, page_size):
+    rows = [
+        {field: getattr(user, field) for field in USER_RESPONSE_FIELDS}
+        for user in make_users(page_size)
+    ]
+    benchmark(lambda: UserResponseSerializer(rows, many=True, fields=USER_RESPONSE_FIELDS).data)
+
+
+@pytest.mark.parametrize('data', [
+    {'name': 'João Silva', 'email': 'joao@example.com', 'password': 'Senha_Forte9'},
+    {'name': 'J', 'email': 'invalido', 'password': 'fraca', 'phone': '123'},
+], ids=['valido', 'invalido'])
+def test_validate_user_data(benchmark, data):
+    benchmark(validate_user_data, data)
+
+
+def test_password_strength(benchmark):
+    benchmark(PasswordSecurity.validate_password_strength, PASSWORD)
+
+
+def test_password_verify(benchmark, password_hash):
+    # bcrypt com custo 12: poucas rodadas bastam
+    benchmark.pedantic(
+        PasswordSecurity.verify_password, args=(PASSWORD, password_hash), rounds=5, iterations=1
+    )
+
+
+def test_password_hash(benchmark):
+    benchmark.pedantic(PasswordSecurity.hash_password, args=(PASSWORD,), rounds=5, iterations=1)
+
+
+@pytest.mark.parametrize('path', MIDDLEWARE_CLASSES, ids=lambda path: path.rsplit('.', 1)[1])
+def test_middleware(benchmark, factory, path):
+    user = User(id=1, email='user@example.com', last_seen_at=timezone.now())
+    payload = {'results': [{'id': i, 'email': f'user{i}@example.com'} for i in range(50)]}
+
+    def view(request):
+        request.user = user
+        return JsonResponse(payload)
+
+    middleware = import_string(path)(view)
+
+    # Inclui a criação do request (~30 µs), igual para todas as classes
+    def call():
+        request = factory.get(
+            '/api/users/',
+            HTTP_X_FORWARDED_FOR='203.0.113.7',
+            HTTP_ACCEPT_ENCODING='gzip',
+        )
+        request.user = AnonymousUser()
+        return middleware(request)
+
+    benchmark(call)
+
+
+def test_ratelimit(benchmark, factory):
+    from django_ratelimit.core import is_ratelimited
+
+    request = factory.get('/api/users/', REMOTE_ADDR='203.0.113.7')
+    cache.clear()
+
+    benchmark(
+        is_ratelimited, request,
+        group='bench', key='ip', rate='1000000/h', method='GET', increment=True,
+    )
+
+
+@pytest.mark.parametrize('exc', [
+    exceptions.NotFound(),
+    exceptions.ValidationError({'email': ['Email inválido']}),
+    exceptions.Throttled(wait=30),
+], ids=['not_found', 'validation', 'throttled'])
+def test_custom_exception_handler(benchmark, factory, exc):
+    from core.exceptions import custom_exception_handler
+
+    context = {'request': Request(factory.get('/api/users/')), 'view': None}
+    benchmark(custom_exception_handler, exc, context)
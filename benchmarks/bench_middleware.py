@@ -0,0 +1,89 @@
+"""
+Overhead por requisição das cadeias de middleware, sem view nem banco.
+
+Compara o perfil "full" (cadeia atual do Django), o "full" com as classes de
+core/middleware.py empilhadas e o perfil "api" com o middleware fundido.
+
+Uso: python -m benchmarks.bench_middleware [--iterations N]
+"""
+import argparse
+import logging
+import os
+import timeit
+
+LEGACY_CORE_MIDDLEWARE = [
+    'core.middleware.RequestLoggingMiddleware',
+    'core.middleware.SecurityHeadersMiddleware',
+    'core.middleware.APIVersionMiddleware',
+    'core.middleware.JSONRequestMiddleware',
+    'core.middleware.CORSMiddleware',
+    'core.middleware.RequestIDMiddleware',
+    'core.middleware.MaintenanceModeMiddleware',
+]
+
+
+def build_chain(middleware, view):
+    from django.utils.module_loading import import_string
+
+    handler = view
+    for path in reversed(middleware):
+        handler = import_string(path)(handler)
+    return handler
+
+
+def measure(func, iterations):
+    return min(timeit.repeat(func, number=iterations, repeat=5)) / iterations * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--iterations', type=int, default=5000)
+    args = parser.parse_args()
+
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+    import django
+    django.setup()
+
+    from django.conf import settings
+    from django.contrib.auth.models import AnonymousUser
+    from django.http import JsonResponse
+    from django.test import RequestFactory
+
+    # O custo medido é o dos middlewares, não o do handler de log
+    logging.disable(logging.WARNING)
+
+    payload = {'id': 1, 'name': 'Bench User', 'email': 'bench@example.com'}
+
+    def view(request):
+        request.user = AnonymousUser()
+        return JsonResponse(payload)
+
+    factory = RequestFactory()
+    chains = [
+        ('sem middleware', []),
+        ('full (cadeia atual)', settings.FULL_MIDDLEWARE),
+        ('full + core.middleware', settings.FULL_MIDDLEWARE + LEGACY_CORE_MIDDLEWARE),
+        ('api (middleware fundido)', settings.API_MIDDLEWARE),
+    ]
+
+    results = []
+    for name, middleware in chains:
+        handler = build_chain(middleware, view)
+        request_kwargs = {
+            'HTTP_HOST': 'localhost',
+            'HTTP_X_FORWARDED_FOR': '203.0.113.7, 10.0.0.1',
+            'HTTP_ACCEPT_ENCODING': 'gzip, br',
+        }
+        results.append((
+            name,
+            measure(lambda: handler(factory.get('/api/users/1/', **request_kwargs)), args.iterations),
+        ))
+
+    baseline = results[0][1]
+    print(f'{args.iterations} iterações (inclui montar o request no RequestFactory)')
+    for name, micros in results:
+        print(f'{name:<28} {micros:8.2f} µs/req  overhead {micros - baseline:8.2f} µs')
+
+
+if __name__ == '__main__':
+    main()
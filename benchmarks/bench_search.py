@@ -0,0 +1,125 @@
+"""
+Latência da busca aproximada (/api/users/search/) sobre uma tabela grande.
+
+Insere usuários sintéticos (emails bench<N>@...) até atingir --rows e mede
+search_users com e sem o modo unaccent. Use um banco descartável.
+
+Uso: python -m benchmarks.bench_search [--rows 1000000] [--queries 200] [--cleanup]
+"""
+import argparse
+import os
+import random
+import statistics
+import time
+
+FIRST_NAMES = [
+    'João', 'José', 'Antônio', 'Francisco', 'Luís', 'Márcio', 'Sérgio', 'Vinícius',
+    'Maria', 'Ana', 'Letícia', 'Júlia', 'Lúcia', 'Mônica', 'Bárbara', 'Cecília',
+]
+LAST_NAMES = [
+    'Silva', 'Santos', 'Conceição', 'Araújo', 'Gonçalves', 'Simões', 'Magalhães',
+    'Assunção', 'Brandão', 'Damião', 'Estêvão', 'Falcão', 'Gusmão', 'Leão', 'Romão',
+]
+DOMAINS = ['gmail.com', 'hotmail.com', 'uol.com.br', 'example.com']
+
+SEED_SQL = """
+INSERT INTO users (password, is_superuser, email, name, is_active, is_staff, created_at, updated_at)
+SELECT '!', false,
+       'bench' || g || '@' || (%(domains)s::text[])[1 + g %% %(num_domains)s],
+       (%(first)s::text[])[1 + floor(random() * %(num_first)s)::int] || ' ' ||
+       (%(last)s::text[])[1 + floor(random() * %(num_last)s)::int] || ' ' ||
+       (%(last)s::text[])[1 + floor(random() * %(num_last)s)::int],
+       true, false, now(), now()
+FROM generate_series(%(start)s, %(stop)s) AS g
+"""
+
+
+def seed(connection, rows, batch_size=100000):
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT count(*) FROM users WHERE email LIKE 'bench%%'")
+        existing = cursor.fetchone()[0]
+
+        for start in range(existing + 1, rows + 1, batch_size):
+            stop = min(start + batch_size - 1, rows)
+            cursor.execute(SEED_SQL, {
+                'domains': DOMAINS, 'num_domains': len(DOMAINS),
+                'first': FIRST_NAMES, 'num_first': len(FIRST_NAMES),
+                'last': LAST_NAMES, 'num_last': len(LAST_NAMES),
+                'start': start, 'stop': stop,
+            })
+            print(f'  {stop} usuários inseridos')
+
+        cursor.execute('ANALYZE users')
+
+
+def strip_accents(text):
+    import unicodedata
+    return ''.join(c for c in unicodedata.normalize('NFKD', text) if not unicodedata.combining(c))
+
+
+def run(queries, unaccent, iterations):
+    from apps.users.search import search_users
+
+    timings = []
+    for query in random.choices(queries, k=iterations):
+        started = time.perf_counter()
+        search_users(query, limit=20, unaccent=unaccent)
+        timings.append((time.perf_counter() - started) * 1000)
+
+    timings.sort()
+    return {
+        'p50': statistics.median(timings),
+        'p95': timings[int(len(timings) * 0.95) - 1],
+        'max': timings[-1],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--cleanup', action='store_true')
+    args = parser.parse_args()
+
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+    import django
+    django.setup()
+
+    from django.db import connection
+
+    print(f'Preparando {args.rows} usuários...')
+    seed(connection, args.rows)
+
+    random.seed(42)
+    names = [f'{first} {last}' for first in FIRST_NAMES for last in LAST_NAMES]
+    partial = [name.split()[1][:5] for name in names]
+
+    scenarios = [
+        ('nome completo', names, False),
+        ('sobrenome parcial', partial, False),
+        ('sem acentos (unaccent)', [strip_accents(n) for n in names], True),
+        ('email', [f'bench{random.randint(1, args.rows)}@' for _ in range(50)], False),
+    ]
+
+    print(f'{"cenário":<28} {"p50 (ms)":>10} {"p95 (ms)":>10} {"max (ms)":>10}')
+    for label, queries, unaccent in scenarios:
+        stats = run(queries, unaccent, args.queries)
+        print(f'{label:<28} {stats["p50"]:10.2f} {stats["p95"]:10.2f} {stats["max"]:10.2f}')
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "EXPLAIN SELECT id FROM users WHERE users_unaccent(name) %%> users_unaccent(%s)",
+            ['Conceicao'],
+        )
+        print('\nPlano (unaccent):')
+        for (line,) in cursor.fetchall():
+            print(f'  {line}')
+
+    if args.cleanup:
+        with connection.cursor() as cursor:
+            cursor.execute("DELETE FROM users WHERE email LIKE 'bench%%'")
+        print('Usuários sintéticos removidos')
+
+
+if __name__ == '__main__':
+    main()
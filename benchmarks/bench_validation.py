@@ -0,0 +1,134 @@
+"""
+Custo da validação de senha e de entrada nos caminhos de cadastro e de
+importação em lote.
+
+As funções legacy_* reproduzem as implementações anteriores (uma busca por
+regex por regra) e servem de referência para comparação.
+
+Uso: python -m benchmarks.bench_validation [--iterations N] [--batch N]
+"""
+import argparse
+import os
+import re
+import timeit
+
+PASSWORDS = ['SenhaForte123!', 'fraca', 'Abcdefgh1!', 'SemEspecial99', 'x' * 40 + 'A1!']
+
+
+def legacy_strength(password):
+    errors = []
+    if len(password) < 8:
+        errors.append("A senha deve ter no mínimo 8 caracteres")
+    if not re.search(r"[A-Z]", password):
+        errors.append("A senha deve conter pelo menos uma letra maiúscula")
+    if not re.search(r"[a-z]", password):
+        errors.append("A senha deve conter pelo menos uma letra minúscula")
+    if not re.search(r"\d", password):
+        errors.append("A senha deve conter pelo menos um número")
+    if not re.search(r'[!@#$%^&*(),.?":{}|<>]', password):
+        errors.append("A senha deve conter pelo menos um caractere especial")
+    return errors
+
+
+def legacy_strict(password):
+    errors = []
+    if len(password) < 8:
+        errors.append("A senha deve ter no mínimo 8 caracteres")
+    if len(password) > 128:
+        errors.append("A senha não pode ter mais de 128 caracteres")
+    if not re.search(r'[A-Z]', password):
+        errors.append("A senha deve conter pelo menos uma letra maiúscula")
+    if not re.search(r'[a-z]', password):
+        errors.append("A senha deve conter pelo menos uma letra minúscula")
+    if not re.search(r'\d', password):
+        errors.append("A senha deve conter pelo menos um número")
+    if not re.search(r'[!@#$%^&*(),.?":{}|<>_\-+=\[\]\\;/~`]', password):
+        errors.append("A senha deve conter pelo menos um caractere especial")
+    common_passwords = [
+        'password', '12345678', 'qwerty', 'abc123', 'password123',
+        '123456789', '12345', '1234567', 'password1', '123456'
+    ]
+    if password.lower() in common_passwords:
+        errors.append("Senha muito comum, escolha uma senha mais segura")
+    if re.search(r'(012|123|234|345|456|567|678|789|890)', password):
+        errors.append("Evite sequências numéricas óbvias")
+    if re.search(r'(abc|bcd|cde|def|efg|fgh|ghi|hij)', password.lower()):
+        errors.append("Evite sequências alfabéticas óbvias")
+    return errors
+
+
+def measure(func, iterations):
+    return min(timeit.repeat(func, number=iterations, repeat=5)) / iterations * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--iterations', type=int, default=20000)
+    parser.add_argument('--batch', type=int, default=1000)
+    args = parser.parse_args()
+
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+    import django
+    django.setup()
+
+    from apps.users.serializers import UserBulkCreateSerializer, UserCreateSerializer
+    from apps.users.validators import validate_user_data, validate_users_batch
+    from core.validation import STRENGTH_RULES, STRICT_RULES
+
+    def each(check):
+        return lambda: [check(password) for password in PASSWORDS]
+
+    per_password = len(PASSWORDS)
+    results = [
+        ('senha (cadastro), regex por regra', measure(each(legacy_strength), args.iterations) / per_password),
+        ('senha (cadastro), motor único', measure(each(STRENGTH_RULES.check), args.iterations) / per_password),
+        ('senha (completa), regex por regra', measure(each(legacy_strict), args.iterations) / per_password),
+        ('senha (completa), motor único', measure(each(STRICT_RULES.check), args.iterations) / per_password),
+    ]
+
+    signup = {'name': 'João Silva', 'email': 'Joao.Silva@Example.com', 'password': 'SenhaForte123!'}
+    results.append((
+        'UserCreateSerializer.is_valid',
+        measure(lambda: UserCreateSerializer(data=signup).is_valid(), args.iterations // 10),
+    ))
+
+    print(f'{args.iterations} iterações')
+    for name, micros in results:
+        print(f'{name:<36} {micros:8.2f} µs')
+
+    rows = [
+        {'name': f'Usuário {i} Silva', 'email': f'user{i}@example.com', 'password': 'SenhaForte123!'}
+        for i in range(args.batch)
+    ]
+    # Linhas que passam nas regras de validate_user_data (sem dígitos no nome
+    # nem sequências na senha)
+    strict_rows = [
+        dict(row, name=f'Usuário {chr(97 + i % 26)} Silva', password='Senha_Forte9')
+        for i, row in enumerate(rows)
+    ]
+
+    def rows_per_second(func):
+        seconds = min(timeit.repeat(func, number=1, repeat=5))
+        return seconds * 1e3, args.batch / seconds
+
+    batch_results = [
+        ('UserCreateSerializer(many=True)', rows_per_second(
+            lambda: UserCreateSerializer(data=rows, many=True).is_valid()
+        )),
+        ('UserBulkCreateSerializer (lote)', rows_per_second(
+            lambda: UserBulkCreateSerializer(data={'users': rows}).is_valid()
+        )),
+        ('validate_user_data por linha', rows_per_second(
+            lambda: [validate_user_data(row) for row in strict_rows]
+        )),
+        ('validate_users_batch', rows_per_second(
+            lambda: validate_users_batch(strict_rows)
+        )),
+    ]
+
+    print(f'\nlotes de {args.batch} linhas')
+    for name, (millis, throughput) in batch_results:
+        print(f'{name:<36} {millis:8.2f} ms  {throughput:10.0f} linhas/s')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+"""
+Compara dois resultados do pytest-benchmark (--benchmark-json) e falha se
+algum benchmark ficou mais lento que o limite.
+
+Uso: python -m benchmarks.compare BASE.json ATUAL.json [--threshold 10] [--stat median]
+"""
+import argparse
+import json
+import sys
+
+
+def load(path, stat):
+    with open(path) as f:
+        data = json.load(f)
+    return {bench['fullname']: bench['stats'][stat] for bench in data['benchmarks']}
+
+
+def compare(base, current, threshold):
+    """Retorna [(nome, base, atual, variação %)] e a lista de regressões."""
+    rows, regressions = [], []
+
+    for name in sorted(base.keys() & current.keys()):
+        change = (current[name] - base[name]) / base[name] * 100
+        rows.append((name, base[name], current[name], change))
+        if change > threshold:
+            regressions.append(name)
+
+    return rows, regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument('base')
+    parser.add_argument('current')
+    parser.add_argument('--threshold', type=float, default=10.0, help='Variação máxima em %%')
+    parser.add_argument('--stat', default='median', choices=['min', 'mean', 'median'])
+    args = parser.parse_args(argv)
+
+    base, current = load(args.base, args.stat), load(args.current, args.stat)
+    rows, regressions = compare(base, current, args.threshold)
+
+    for name, before, after, change in rows:
+        flag = '  REGRESSÃO' if name in regressions else ''
+        print(f'{name:<80} {before * 1e6:12.2f} µs {after * 1e6:12.2f} µs {change:+8.1f}%{flag}')
+
+    for name in sorted(base.keys() - current.keys()):
+        print(f'{name:<80} ausente no resultado atual')
+
+    if regressions:
+        print(f'\n{len(regressions)} benchmark(s) acima de {args.threshold:.0f}% ({args.stat})')
+        return 1
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,22 @@
+"""
+Configuração da suíte de microbenchmarks (pytest-benchmark).
+
+Os benchmarks não acessam o banco: usam instâncias não salvas, RequestFactory
+e o cache local, então rodam offline, sem Postgres.
+"""
+import logging
+import os
+
+import django
+import pytest
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+django.setup()
+
+
+@pytest.fixture(autouse=True)
+def _quiet_logging():
+    # Mede o código, não os handlers de log (console/arquivo)
+    logging.disable(logging.CRITICAL)
+    yield
+    logging.disable(logging.NOTSET)
@@ -0,0 +1,382 @@
+"""
+Teste de carga de ponta a ponta contra um servidor em execução.
+
+    python -m benchmarks.loadtest seed --users 100000
+    python -m benchmarks.loadtest run --url http://localhost:8000 --rps 200 --duration 60
+
+O seed grava usuários sintéticos (load<N>@loadtest.example.com) direto no
+banco com COPY, usando um único hash de senha pré-calculado. O run não usa o
+Django: abre sessões via /login/ e dispara uma carga mista (login, listagem
+com páginas profundas, detalhe, atualização e cadastro) em malha aberta, com
+chegadas de Poisson na taxa pedida. A latência é medida a partir do instante
+agendado de cada requisição, então filas no cliente ou no servidor aparecem
+nos percentis. O relatório sai em JSON e HTML.
+
+Rode o servidor com RATELIMIT_ENABLE=False, senão os limites por IP das
+views dominam o resultado.
+"""
+import argparse
+import html
+import http.client
+import io
+import json
+import os
+import random
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+SEED_EMAIL = 'load{}@loadtest.example.com'
+SEED_EMAIL_PATTERN = 'load%@loadtest.example.com'
+DEFAULT_PASSWORD = 'LoadTest!2024'
+
+COPY_SQL = (
+    "COPY users (password, is_superuser, email, name, is_active, is_staff, created_at, updated_at) "
+    "FROM STDIN"
+)
+
+DEFAULT_MIX = 'login=10,list=35,detail=35,update=15,signup=5'
+PERCENTILES = (50, 90, 95, 99)
+
+
+def seed(users, password, batch_size):
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+    import django
+    django.setup()
+
+    from datetime import timedelta
+    from django.contrib.auth.hashers import make_password
+    from django.db import connection, transaction
+    from django.utils import timezone
+
+    hashed = make_password(password)
+    now = timezone.now()
+    started = time.perf_counter()
+
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT count(*) FROM users WHERE email LIKE %s", [SEED_EMAIL_PATTERN])
+        existing = cursor.fetchone()[0]
+
+        for start in range(existing, users, batch_size):
+            stop = min(start + batch_size, users)
+            buffer = io.StringIO()
+
+            for i in range(start, stop):
+                # created_at espalhado no passado para a ordenação ter páginas profundas
+                created = (now - timedelta(seconds=users - i)).isoformat()
+                buffer.write(
+                    f"{hashed}\tf\t{SEED_EMAIL.format(i)}\tLoad User {i}\tt\tf\t{created}\t{created}\n"
+                )
+
+            buffer.seek(0)
+            with transaction.atomic():
+                cursor.copy_expert(COPY_SQL, buffer)
+            print(f'  {stop} usuários')
+
+        cursor.execute('ANALYZE users')
+
+    elapsed = time.perf_counter() - started
+    inserted = max(users - existing, 0)
+    print(f'{inserted} usuários inseridos em {elapsed:.1f}s ({inserted / max(elapsed, 1e-9):.0f}/s)')
+
+
+class Client:
+    """Uma conexão HTTP keep-alive por thread."""
+
+    def __init__(self, base_url, timeout):
+        parts = urlsplit(base_url)
+        self.scheme = parts.scheme
+        self.netloc = parts.netloc
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _connection(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection_class = (
+                http.client.HTTPSConnection if self.scheme == 'https' else http.client.HTTPConnection
+            )
+            connection = connection_class(self.netloc, timeout=self.timeout)
+            self._local.connection = connection
+        return connection
+
+    def request(self, method, path, body=None, token=None):
+        headers = {'Accept': 'application/json'}
+        if body is not None:
+            body = json.dumps(body)
+            headers['Content-Type'] = 'application/json'
+        if token:
+            headers['Authorization'] = f'Bearer {token}'
+
+        connection = self._connection()
+        try:
+            connection.request(method, path, body=body, headers=headers)
+            response = connection.getresponse()
+            payload = response.read()
+        except (OSError, http.client.HTTPException):
+            connection.close()
+            self._local.connection = None
+            raise
+
+        return response.status, payload
+
+
+class Workload:
+
+    def __init__(self, client, seeded_users, password, page_size, max_page, sessions):
+        self.client = client
+        self.seeded_users = seeded_users
+        self.password = password
+        self.page_size = page_size
+        self.max_page = max_page
+        self.sessions = sessions
+
+    def random_email(self):
+        return SEED_EMAIL.format(random.randrange(self.seeded_users))
+
+    def login(self, email=None):
+        return self.client.request(
+            'POST', '/api/users/login/',
+            {'email': email or self.random_email(), 'password': self.password},
+        )
+
+    def open_sessions(self, count):
+        status = None
+        for _ in range(count):
+            status, payload = self.login()
+            if status == 200:
+                data = json.loads(payload)
+                self.sessions.append((data['access'], data['user']['id']))
+
+        if not self.sessions:
+            raise RuntimeError(
+                f"Nenhuma sessão aberta (último status {status}): confira --url, o seed e a senha"
+            )
+
+    def run(self, operation):
+        token, user_id = random.choice(self.sessions)
+
+        if operation == 'login':
+            return self.login()
+
+        if operation == 'list':
+            page = random.randint(1, self.max_page)
+            return self.client.request(
+                'GET', f'/api/users/?page={page}&page_size={self.page_size}', token=token
+            )
+
+        if operation == 'detail':
+            _, other_id = random.choice(self.sessions)
+            return self.client.request('GET', f'/api/users/{other_id}/', token=token)
+
+        if operation == 'update':
+            return self.client.request(
+                'PUT', f'/api/users/{user_id}/',
+                {'name': f'Load User {random.randrange(10**6)}'}, token=token,
+            )
+
+        if operation == 'signup':
+            return self.client.request('POST', '/api/users/', {
+                'name': 'Load Signup',
+                'email': f'signup-{uuid.uuid4().hex}@loadtest.example.com',
+                'password': self.password,
+            })
+
+        raise ValueError(f'Operação desconhecida: {operation}')
+
+
+def parse_mix(mix):
+    weights = {}
+    for item in mix.split(','):
+        name, _, weight = item.partition('=')
+        weights[name.strip()] = float(weight)
+    return weights
+
+
+def percentile(sorted_values, p):
+    if not sorted_values:
+        return None
+    index = max(0, min(len(sorted_values) - 1, round(p / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def summarize(samples, duration):
+    """samples: [(operação, latência em s, status ou None)]"""
+    by_operation = {}
+    for operation, latency, status in samples:
+        by_operation.setdefault(operation, []).append((latency, status))
+
+    def stats(entries):
+        latencies = sorted(latency * 1000 for latency, _ in entries)
+        errors = sum(1 for _, status in entries if status is None or status >= 400)
+        result = {
+            'requests': len(entries),
+            'errors': errors,
+            'error_rate': errors / len(entries) if entries else 0.0,
+            'throughput_rps': len(entries) / duration,
+            'max_ms': latencies[-1] if latencies else None,
+        }
+        for p in PERCENTILES:
+            result[f'p{p}_ms'] = percentile(latencies, p)
+        return result
+
+    report = {name: stats(entries) for name, entries in sorted(by_operation.items())}
+    report['total'] = stats([(latency, status) for _, latency, status in samples])
+    return report
+
+
+def run_load(workload, weights, rps, duration, concurrency, seed_value=None):
+    rng = random.Random(seed_value)
+    operations, cumulative = list(weights), list(weights.values())
+    samples, lock = [], threading.Lock()
+
+    def execute(operation, scheduled):
+        try:
+            status, _ = workload.run(operation)
+        except Exception:
+            status = None
+        latency = time.perf_counter() - scheduled
+        with lock:
+            samples.append((operation, latency, status))
+
+    started = time.perf_counter()
+    next_arrival = started
+    sent = 0
+
+    # Malha aberta: as chegadas seguem o relógio, não esperam as respostas
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        while True:
+            next_arrival += rng.expovariate(rps)
+            if next_arrival - started >= duration:
+                break
+
+            delay = next_arrival - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+
+            operation = rng.choices(operations, weights=cumulative)[0]
+            pool.submit(execute, operation, next_arrival)
+            sent += 1
+
+    elapsed = time.perf_counter() - started
+    return samples, sent, elapsed
+
+
+def render_html(result):
+    columns = ['requests', 'errors', 'error_rate', 'throughput_rps'] + [f'p{p}_ms' for p in PERCENTILES] + ['max_ms']
+
+    def cell(value):
+        if value is None:
+            return '-'
+        if isinstance(value, float):
+            return f'{value:.3f}' if value < 1 else f'{value:.1f}'
+        return str(value)
+
+    rows = ''.join(
+        '<tr><th>{}</th>{}</tr>'.format(
+            html.escape(name), ''.join(f'<td>{cell(stats[column])}</td>' for column in columns)
+        )
+        for name, stats in result['endpoints'].items()
+    )
+    config = html.escape(json.dumps(result['config'], indent=2))
+
+    return f"""<!DOCTYPE html>
+<html lang="pt-br">
+<head>
+<meta charset="utf-8">
+<title>Teste de carga - {html.escape(result['config']['url'])}</title>
+<style>
+body {{ font-family: sans-serif; margin: 2em; }}
+table {{ border-collapse: collapse; }}
+th, td {{ border: 1px solid #ccc; padding: 4px 10px; text-align: right; }}
+thead th {{ background: #eee; }}
+</style>
+</head>
+<body>
+<h1>Teste de carga</h1>
+<p>{result['sent']} requisições em {result['elapsed_s']:.1f}s
+(alvo {result['config']['rps']} req/s, obtido {result['achieved_rps']:.1f} req/s)</p>
+<table>
+<thead><tr><th>operação</th>{''.join(f'<th>{column}</th>' for column in columns)}</tr></thead>
+<tbody>{rows}</tbody>
+</table>
+<h2>Configuração</h2>
+<pre>{config}</pre>
+</body>
+</html>
+"""
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    seed_parser = subparsers.add_parser('seed', help='Insere usuários sintéticos via COPY')
+    seed_parser.add_argument('--users', type=int, default=100_000)
+    seed_parser.add_argument('--password', default=DEFAULT_PASSWORD)
+    seed_parser.add_argument('--batch-size', type=int, default=50_000)
+
+    run_parser = subparsers.add_parser('run', help='Executa a carga mista contra um servidor')
+    run_parser.add_argument('--url', default='http://localhost:8000')
+    run_parser.add_argument('--rps', type=float, default=100)
+    run_parser.add_argument('--duration', type=float, default=60)
+    run_parser.add_argument('--mix', default=DEFAULT_MIX, help=f'Pesos por operação (padrão: {DEFAULT_MIX})')
+    run_parser.add_argument('--users', type=int, default=100_000, help='Usuários criados pelo seed')
+    run_parser.add_argument('--password', default=DEFAULT_PASSWORD)
+    run_parser.add_argument('--sessions', type=int, default=50, help='Sessões autenticadas abertas antes da carga')
+    run_parser.add_argument('--page-size', type=int, default=20)
+    run_parser.add_argument('--max-page', type=int, default=1000, help='Página mais profunda da listagem')
+    run_parser.add_argument('--concurrency', type=int, default=256, help='Requisições simultâneas no cliente')
+    run_parser.add_argument('--timeout', type=float, default=30)
+    run_parser.add_argument('--seed', type=int, default=None, help='Semente das chegadas e do mix')
+    run_parser.add_argument('--output', default='loadtest', help='Prefixo dos arquivos .json e .html')
+
+    args = parser.parse_args()
+
+    if args.command == 'seed':
+        seed(args.users, args.password, args.batch_size)
+        return
+
+    weights = parse_mix(args.mix)
+    client = Client(args.url, args.timeout)
+    workload = Workload(client, args.users, args.password, args.page_size, args.max_page, sessions=[])
+
+    print(f'Abrindo {args.sessions} sessões...')
+    workload.open_sessions(args.sessions)
+
+    print(f'Carga: {args.rps} req/s por {args.duration}s ({args.mix})')
+    samples, sent, elapsed = run_load(
+        workload, weights, args.rps, args.duration, args.concurrency, args.seed
+    )
+
+    result = {
+        'config': {
+            'url': args.url, 'rps': args.rps, 'duration_s': args.duration, 'mix': weights,
+            'users': args.users, 'sessions': len(workload.sessions),
+            'page_size': args.page_size, 'max_page': args.max_page,
+            'concurrency': args.concurrency,
+        },
+        'sent': sent,
+        'elapsed_s': elapsed,
+        'achieved_rps': len(samples) / elapsed,
+        'endpoints': summarize(samples, elapsed),
+    }
+
+    with open(f'{args.output}.json', 'w') as f:
+        json.dump(result, f, indent=2)
+    with open(f'{args.output}.html', 'w') as f:
+        f.write(render_html(result))
+
+    for name, stats in result['endpoints'].items():
+        print(
+            f"{name:<8} {stats['requests']:7d} req  erros {stats['error_rate']:6.1%}  "
+            f"p50 {stats['p50_ms']:8.1f} ms  p99 {stats['p99_ms']:8.1f} ms  "
+            f"{stats['throughput_rps']:7.1f} req/s"
+        )
+    print(f'Relatório: {args.output}.json, {args.output}.html')
+
+
+if __name__ == '__main__':
+    main()
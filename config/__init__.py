@@ -1,3 +1,11 @@
-from .celery import app as celery_app
+# O app do Celery é carregado sob demanda: workers WSGI não pagam o import
+# do celery/kombu no boot. `celery -A config` o encontra em config.celery.
+def __getattr__(name):
+    if name == 'celery_app':
+        from .celery import app
 
-__all__ = ('celery_app',)
\ No newline at end of file
+        return app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+__all__ = ('celery_app',)
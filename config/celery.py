@@ -34,8 +34,10 @@ def send_welcome_email(user_email, user_name):
 @app.task(name='cleanup_inactive_users')
 def cleanup_inactive_users():
     from datetime import timedelta
+    from django.db import transaction
     from django.utils import timezone
-    from apps.users.models import User
+    from apps.users.events import emit_events
+    from apps.users.models import User, UserEvent
 
     cutoff_date = timezone.now() - timedelta(days=30)
         
@@ -43,30 +45,40 @@ def cleanup_inactive_users():
         is_active = False,
         updated_at__lt=cutoff_date
     )
-        
-    count, _ = inactive_users.delete()[0]
+    
+    # Tombstones (user.deleted) na mesma transação: o feed /api/users/changes/ os entrega
+    with transaction.atomic():
+        ids = list(inactive_users.select_for_update().values_list('id', flat=True))
+        emit_events(UserEvent.EventType.DELETED, ids)
+        count, _ = User.objects.filter(id__in=ids).delete()
         
     return f'{count} usuários inativos removidos'
 
 
+@app.task(name='deliver_webhooks', ignore_result=True)
+def deliver_webhooks():
+    from apps.users.webhooks import deliver_webhooks as deliver
+
+    return deliver()
+
+
 @app.task(name='generate_user_report')
 def generate_user_report():
-    from core.database import SessionLocal, UserModel
-    
-    db = SessionLocal()
-    try:
-        total_users = db.query(UserModel).count()
-        active_users = db.query(UserModel).filter(UserModel.is_active == True).count()
-        inactive_users = total_users - active_users
-        
-        report = {
-            'total': total_users,
-            'active': active_users,
-            'inactive': inactive_users,
-            'active_percentage': (active_users / total_users * 100) if total_users > 0 else 0
-        }
-        
-        return report
-    
-    finally:
-        db.close()
\ No newline at end of file
+    from django.db.models import Count, Q
+    from apps.users.models import User
+
+    counts = User.objects.aggregate(
+        total=Count('id'),
+        active=Count('id', filter=Q(is_active=True)),
+    )
+    total_users, active_users = counts['total'], counts['active']
+    inactive_users = total_users - active_users
+
+    report = {
+        'total': total_users,
+        'active': active_users,
+        'inactive': inactive_users,
+        'active_percentage': (active_users / total_users * 100) if total_users > 0 else 0
+    }
+
+    return report
@@ -1,5 +1,7 @@
 from pathlib import Path
+from importlib.util import find_spec
 from decouple import config
+from corsheaders.defaults import default_headers
 from datetime import timedelta
 
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -8,26 +10,43 @@ SECRET_KEY = config('SECRET_KEY', default='change-me-in-production')
 DEBUG = config('DEBUG', default=True, cast=bool)
 ALLOWED_HOSTS = config('ALLOWED_HOSTS', default='localhost,127.0.0.1').split(',')
 
+# Perfil "full" (padrão): cadeia completa do Django, necessária para o admin.
+# Perfil "api" (opcional, para workers só de API): a API autentica só via JWT,
+# então sessão, CSRF, mensagens e admin ficam de fora e o APIFastPathMiddleware
+# cobre logging/headers/versão/request ID/manutenção.
+MIDDLEWARE_PROFILE = config('MIDDLEWARE_PROFILE', default='full')
+
+# Sem sessão o admin não funciona; no perfil "api" ele nem é instalado (boot mais leve)
+ADMIN_ENABLED = MIDDLEWARE_PROFILE != 'api'
+
 INSTALLED_APPS = [
-    'django.contrib.admin',
     'django.contrib.auth',
     'django.contrib.contenttypes',
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     
     'rest_framework',
     'corsheaders',
-    'drf_yasg',
     
     'apps.users',
 ]
 
+if ADMIN_ENABLED:
+    INSTALLED_APPS.insert(0, 'django.contrib.admin')
+
+# O drf_yasg não é uma app instalada: importar o pacote custa ~90 ms no boot
+# (pkg_resources). Templates e estáticos das UIs entram pelo caminho e o módulo
+# só é importado ao gerar o schema (core.openapi).
+DRF_YASG_DIR = Path(find_spec('drf_yasg').origin).parent
+
 AUTH_USER_MODEL = 'users.User'
 
-MIDDLEWARE = [
+FULL_MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',  
+    'core.middleware.CompressionMiddleware',
     'corsheaders.middleware.CorsMiddleware',  
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -35,14 +54,28 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'core.middleware.APIVersionMiddleware',
+    'core.middleware.UserActivityMiddleware',
+]
+
+API_MIDDLEWARE = [
+    'django.middleware.security.SecurityMiddleware',
+    'whitenoise.middleware.WhiteNoiseMiddleware',
+    'core.middleware.CompressionMiddleware',
+    'corsheaders.middleware.CorsMiddleware',
+    'core.middleware.APIFastPathMiddleware',
+    'django.middleware.common.CommonMiddleware',
+    'core.middleware.UserActivityMiddleware',
 ]
 
+MIDDLEWARE = API_MIDDLEWARE if MIDDLEWARE_PROFILE == 'api' else FULL_MIDDLEWARE
+
 ROOT_URLCONF = 'config.urls'
 
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
-        'DIRS': [],
+        'DIRS': [DRF_YASG_DIR / 'templates'],
         'APP_DIRS': True,
         'OPTIONS': {
             'context_processors': [
@@ -71,10 +104,13 @@ DATABASES = {
 AUTH_PASSWORD_VALIDATORS = [
     {'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator'},
     {'NAME': 'django.contrib.auth.password_validation.MinimumLengthValidator'},
-    {'NAME': 'django.contrib.auth.password_validation.CommonPasswordValidator'},
+    {'NAME': 'core.blocklist.BlocklistPasswordValidator'},
     {'NAME': 'django.contrib.auth.password_validation.NumericPasswordValidator'},
 ]
 
+# Custo do bcrypt em core.security (o perfil de testes reduz para o mínimo)
+BCRYPT_ROUNDS = config('BCRYPT_ROUNDS', default=12, cast=int)
+
 LANGUAGE_CODE = 'pt-br'
 TIME_ZONE = 'America/Sao_Paulo'
 USE_I18N = True
@@ -82,6 +118,7 @@ USE_TZ = True
 
 STATIC_URL = 'static/'
 STATIC_ROOT = BASE_DIR / 'staticfiles'
+STATICFILES_DIRS = [DRF_YASG_DIR / 'static']
 STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
@@ -96,12 +133,13 @@ REST_FRAMEWORK = {
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 20,
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'apps.users.authentication.CachedJWTAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.AllowAny',
     ],
     'EXCEPTION_HANDLER': 'rest_framework.views.exception_handler',
+    'DEFAULT_VERSIONING_CLASS': 'core.versioning.APIVersioning',
 }
 
 SIMPLE_JWT = {
@@ -115,6 +153,48 @@ SIMPLE_JWT = {
     'SIGNING_KEY': config('JWT_SECRET_KEY', default=SECRET_KEY),
 }
 
+# Usuário autenticado é resolvido pelo cache; no modo stateless apenas pelas claims do token
+USER_CACHE_TTL = config('USER_CACHE_TTL', default=60, cast=int)
+JWT_STATELESS_AUTH = config('JWT_STATELESS_AUTH', default=False, cast=bool)
+
+# last_seen_at é gravado em lote (write-behind) pelo UserActivityMiddleware
+LAST_SEEN_GRANULARITY = config('LAST_SEEN_GRANULARITY', default=300, cast=int)
+LAST_SEEN_FLUSH_INTERVAL = config('LAST_SEEN_FLUSH_INTERVAL', default=30, cast=int)
+LAST_SEEN_FLUSH_SIZE = config('LAST_SEEN_FLUSH_SIZE', default=500, cast=int)
+
+# Senhas vazadas/comuns (gerar com: python manage.py build_password_blocklist)
+PASSWORD_BLOCKLIST_PATH = config(
+    'PASSWORD_BLOCKLIST_PATH', default=str(BASE_DIR / 'data' / 'password_blocklist.bin')
+)
+
+# Política de domínios de email (recarregada sem reiniciar quando os arquivos mudam)
+EMAIL_DOMAIN_DENYLIST_PATH = config(
+    'EMAIL_DOMAIN_DENYLIST_PATH', default=str(BASE_DIR / 'data' / 'disposable_domains.txt')
+)
+EMAIL_DOMAIN_ALLOWLIST_PATH = config(
+    'EMAIL_DOMAIN_ALLOWLIST_PATH', default=str(BASE_DIR / 'data' / 'allowed_domains.txt')
+)
+EMAIL_DOMAIN_POLICY_CHECK_INTERVAL = config('EMAIL_DOMAIN_POLICY_CHECK_INTERVAL', default=30, cast=int)
+
+# Compressão de respostas (gzip sempre; br/zstd se brotli/zstandard estiverem instalados).
+# Respostas private/no-store não são comprimidas; só as public entram no cache de variantes.
+COMPRESSION_MIN_SIZE = config('COMPRESSION_MIN_SIZE', default=1024, cast=int)
+COMPRESSION_CACHE_ENTRIES = config('COMPRESSION_CACHE_ENTRIES', default=256, cast=int)
+COMPRESSION_CACHE_MAX_BODY = config('COMPRESSION_CACHE_MAX_BODY', default=1024 * 1024, cast=int)
+COMPRESSION_CACHE_MAX_BYTES = config('COMPRESSION_CACHE_MAX_BYTES', default=16 * 1024 * 1024, cast=int)
+
+# Revogação de tokens (logout): filtro de Bloom local sincronizado com o cache
+TOKEN_REVOCATION_CAPACITY = config('TOKEN_REVOCATION_CAPACITY', default=100000, cast=int)
+TOKEN_REVOCATION_ERROR_RATE = config('TOKEN_REVOCATION_ERROR_RATE', default=0.001, cast=float)
+TOKEN_REVOCATION_SYNC_INTERVAL = config('TOKEN_REVOCATION_SYNC_INTERVAL', default=5, cast=int)
+
+# Idempotency-Key (cadastro e login): resposta guardada no cache e trava para repetições concorrentes
+IDEMPOTENCY_TTL = config('IDEMPOTENCY_TTL', default=3600, cast=int)
+# Login guarda tokens JWT em texto no cache: janela curta, só para repetições após timeout
+IDEMPOTENCY_LOGIN_TTL = config('IDEMPOTENCY_LOGIN_TTL', default=60, cast=int)
+IDEMPOTENCY_LOCK_TIMEOUT = config('IDEMPOTENCY_LOCK_TIMEOUT', default=30, cast=int)
+IDEMPOTENCY_WAIT_TIMEOUT = config('IDEMPOTENCY_WAIT_TIMEOUT', default=10, cast=float)
+
 CORS_ALLOWED_ORIGINS = config(
     'CORS_ALLOWED_ORIGINS',
     default='http://localhost:3000,http://localhost:8080'
@@ -122,6 +202,8 @@ CORS_ALLOWED_ORIGINS = config(
 
 CORS_ALLOW_CREDENTIALS = True
 
+CORS_ALLOW_HEADERS = (*default_headers, 'idempotency-key', 'x-api-version')
+
 if not DEBUG:
     SECURE_SSL_REDIRECT = True
     SESSION_COOKIE_SECURE = True
@@ -175,9 +257,20 @@ SWAGGER_SETTINGS = {
             'name': 'Authorization',
             'in': 'header'
         }
-    }
+    },
+    # As UIs buscam o schema pré-calculado (core.openapi) em vez de gerá-lo a cada acesso
+    'SPEC_URL': 'schema-json',
 }
 
+REDOC_SETTINGS = {
+    'SPEC_URL': 'schema-json',
+}
+
+# Schema OpenAPI gerado por `manage.py build_openapi_schema` ou no primeiro acesso.
+# Em DEBUG o arquivo não é reaproveitado entre processos (o código muda com frequência).
+OPENAPI_SCHEMA_PATH = config('OPENAPI_SCHEMA_PATH', default=str(BASE_DIR / 'data' / 'openapi.json'))
+OPENAPI_SCHEMA_REUSE_FILE = config('OPENAPI_SCHEMA_REUSE_FILE', default=not DEBUG, cast=bool)
+
 RATELIMIT_ENABLE = config('RATELIMIT_ENABLE', default=True, cast=bool)
 RATELIMIT_USE_CACHE = 'default'
 
@@ -186,4 +279,37 @@ CACHES = {
         'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
         'LOCATION': 'unique-snowflake',
     }
-}
\ No newline at end of file
+}
+
+# Com mais de um worker o cache precisa ser compartilhado (revogação de tokens, usuários)
+REDIS_URL = config('REDIS_URL', default='')
+if REDIS_URL:
+    CACHES['default'] = {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': REDIS_URL,
+    }
+
+CELERY_BROKER_URL = config('CELERY_BROKER_URL', default=REDIS_URL)
+
+# Webhooks: lotes do outbox por assinatura, pool de conexões por destino e backoff exponencial
+WEBHOOK_DELIVERY_INTERVAL = config('WEBHOOK_DELIVERY_INTERVAL', default=5, cast=float)
+WEBHOOK_BATCH_SIZE = config('WEBHOOK_BATCH_SIZE', default=100, cast=int)
+WEBHOOK_MAX_PENDING_BATCHES = config('WEBHOOK_MAX_PENDING_BATCHES', default=50, cast=int)
+WEBHOOK_SEND_LIMIT = config('WEBHOOK_SEND_LIMIT', default=100, cast=int)
+WEBHOOK_MAX_WORKERS = config('WEBHOOK_MAX_WORKERS', default=16, cast=int)
+WEBHOOK_MAX_CONNECTIONS_PER_HOST = config('WEBHOOK_MAX_CONNECTIONS_PER_HOST', default=4, cast=int)
+WEBHOOK_TIMEOUT = config('WEBHOOK_TIMEOUT', default=10, cast=float)
+WEBHOOK_MAX_ATTEMPTS = config('WEBHOOK_MAX_ATTEMPTS', default=10, cast=int)
+WEBHOOK_RETRY_BASE_DELAY = config('WEBHOOK_RETRY_BASE_DELAY', default=30, cast=float)
+WEBHOOK_RETRY_MAX_DELAY = config('WEBHOOK_RETRY_MAX_DELAY', default=3600, cast=float)
+
+CELERY_BEAT_SCHEDULE = {
+    'deliver-webhooks': {
+        'task': 'deliver_webhooks',
+        'schedule': WEBHOOK_DELIVERY_INTERVAL,
+    },
+}
+
+# /readyz: resultado dos probes reaproveitado por alguns segundos em cada worker
+READINESS_CACHE_SECONDS = config('READINESS_CACHE_SECONDS', default=5, cast=float)
+READINESS_PROBE_TIMEOUT = config('READINESS_PROBE_TIMEOUT', default=2, cast=float)
\ No newline at end of file
@@ -0,0 +1,25 @@
+"""
+Perfil de testes: hashing barato e cache local por processo.
+
+Selecionado pelo pytest.ini. O isolamento entre testes vem de transações
+desfeitas ao final (pytest-django e core.database.rollback_session), o banco
+de teste é reaproveitado entre execuções (--reuse-db) e, com `pytest -n`,
+cada worker usa o próprio banco.
+"""
+from config.settings import *  # noqa: F401,F403
+
+PASSWORD_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
+
+# Mínimo aceito pelo bcrypt
+BCRYPT_ROUNDS = 4
+
+# Um Redis compartilhado misturaria o estado de workers paralelos
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'tests',
+    }
+}
+
+# Sem collectstatic nos testes: o manifest do whitenoise não existe
+STATICFILES_STORAGE = 'django.contrib.staticfiles.storage.StaticFilesStorage'
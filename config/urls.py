@@ -1,29 +1,37 @@
-from django.contrib import admin
-from django.urls import path, include
-from rest_framework import permissions
-from drf_yasg.views import get_schema_view
-from drf_yasg import openapi
+from django.conf import settings
+from django.urls import path, include, re_path
 
-schema_view = get_schema_view(
-    openapi.Info(
-        title="Users API",
-        default_version='v1',
-        description="API RESTful para gerenciamento de usuários com Django, PostgreSQL e SQLAlchemy",
-        terms_of_service="https://www.google.com/policies/terms/",
-        contact=openapi.Contact(email="contato@example.com"),
-        license=openapi.License(name="MIT License"),
-    ),
-    public=True,
-    permission_classes=(permissions.AllowAny,),
-)
+from core.health import readiness_view
+from core.openapi import redoc_view, schema_view, swagger_view
 
-urlpatterns = [
-    path('admin/', admin.site.urls),
+
+def build_urlpatterns(users_urlconf):
+    """
+    URLs versionadas ficam sempre disponíveis; /api/users/ serve a versão
+    padrão, ou a negociada via X-API-Version (ver core.versioning).
+    """
+    patterns = [
+        path('api/v1/users/', include(('apps.users.urls', 'v1'), namespace='v1')),
+        
+        path('api/v2/users/', include(('apps.users.urls_v2', 'v2'), namespace='v2')),
+        
+        path('api/users/', include((users_urlconf, 'users'), namespace='users')),
+        
+        # /healthz é respondido antes do Django (core.health.LivenessApp em config/wsgi.py)
+        re_path(r'^readyz/?$', readiness_view, name='readyz'),
+        
+        path('', swagger_view, name='schema-swagger-ui'),
+        path('api/docs/', swagger_view, name='schema-swagger-ui'),
+        path('api/redoc/', redoc_view, name='schema-redoc'),
+        path('api/schema/', schema_view, name='schema-json'),
+    ]
     
-    path('api/users/', include('apps.users.urls')),
+    if settings.ADMIN_ENABLED:
+        from django.contrib import admin
+
+        patterns.insert(0, path('admin/', admin.site.urls))
     
-    path('', schema_view.with_ui('swagger', cache_timeout=0), name='schema-swagger-ui'),
-    path('api/docs/', schema_view.with_ui('swagger', cache_timeout=0), name='schema-swagger-ui'),
-    path('api/redoc/', schema_view.with_ui('redoc', cache_timeout=0), name='schema-redoc'),
-    path('api/schema/', schema_view.without_ui(cache_timeout=0), name='schema-json'),
-]
\ No newline at end of file
+    return patterns
+
+
+urlpatterns = build_urlpatterns('apps.users.urls')
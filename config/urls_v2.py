@@ -0,0 +1,4 @@
+"""URLconf raiz usado quando o cliente negocia X-API-Version: 2.0."""
+from config.urls import build_urlpatterns
+
+urlpatterns = build_urlpatterns('apps.users.urls_v2')
@@ -0,0 +1,21 @@
+import pytest
+
+
+@pytest.fixture(scope='session')
+def django_db_setup(django_db_setup, django_db_blocker):
+    # O engine do SQLAlchemy nasce apontando para DB_NAME; passa a usar o
+    # banco de teste criado pelo pytest-django (test_<DB_NAME>[_gwN] por worker).
+    from django.db import connection
+    from core.database import use_database
+
+    use_database(connection.settings_dict['NAME'])
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    # O LocMem sobrevive entre testes: rate limit, cache de usuários e
+    # Idempotency-Key de um teste vazariam para o seguinte
+    from django.core.cache import cache
+
+    cache.clear()
+    yield
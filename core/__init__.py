@@ -1,13 +1,15 @@
 __version__ = '1.0.0'
 __author__ = 'Matchiga'
 
-from .exceptions import (
-    APIException,
-    ValidationException,
-    AuthenticationException,
-    PermissionDeniedException,
-    ResourceNotFoundException
-)
+# As exceções dependem do DRF; são importadas só quando acessadas, para que
+# módulos leves (core.validation, core.blocklist...) não carreguem o DRF.
+def __getattr__(name):
+    if name in __all__:
+        from . import exceptions
+
+        return getattr(exceptions, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 __all__ = [
     'APIException',
@@ -15,4 +17,4 @@ __all__ = [
     'AuthenticationException',
     'PermissionDeniedException',
     'ResourceNotFoundException',
-]
\ No newline at end of file
+]
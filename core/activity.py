@@ -0,0 +1,128 @@
+import atexit
+import logging
+import threading
+import time
+from datetime import timedelta
+
+logger = logging.getLogger(__name__)
+
+
+def write_last_seen(pending, granularity):
+    """
+    Grava todas as marcações pendentes num único UPDATE ... FROM (VALUES ...).
+    Linhas cujo last_seen_at não avançou mais que `granularity` segundos são ignoradas.
+    """
+    from sqlalchemy import text
+
+    from core.database import engine
+
+    rows = []
+    params = {'granularity': timedelta(seconds=granularity)}
+    for i, (user_id, seen_at) in enumerate(pending.items()):
+        rows.append(f'(:id{i}, :seen{i})')
+        params[f'id{i}'] = user_id
+        params[f'seen{i}'] = seen_at
+
+    statement = text(
+        'UPDATE users SET last_seen_at = v.last_seen '
+        f'FROM (VALUES {", ".join(rows)}) AS v(id, last_seen) '
+        'WHERE users.id = v.id '
+        'AND (users.last_seen_at IS NULL '
+        'OR users.last_seen_at < v.last_seen - :granularity)'
+    )
+
+    with engine.begin() as conn:
+        return conn.execute(statement, params).rowcount
+
+
+class LastSeenBuffer:
+    """
+    Buffer em memória, por worker, de user_id -> last_seen.
+
+    Marcações do mesmo usuário são coalescidas e gravadas em lote a cada
+    `flush_interval` segundos ou quando o buffer atinge `max_entries`. Com
+    `start()` a gravação roda numa thread de fundo, inclusive com o worker
+    ocioso, e nenhuma requisição paga pelo lote; sem ela, a requisição que
+    encontra o buffer vencido grava. O que estiver no buffer é gravado no
+    encerramento normal do processo (atexit) e perdido se ele for morto.
+    """
+
+    def __init__(self, flush_interval, max_entries, granularity, writer=write_last_seen):
+        self.flush_interval = flush_interval
+        self.max_entries = max_entries
+        self.granularity = granularity
+        self.writer = writer
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._last_flush = time.monotonic()
+        self._wake = threading.Event()
+        self._thread = None
+
+    def __len__(self):
+        return len(self._pending)
+
+    def record(self, user_id, seen_at):
+        with self._lock:
+            current = self._pending.get(user_id)
+            if current is None or seen_at > current:
+                self._pending[user_id] = seen_at
+
+            full = len(self._pending) >= self.max_entries
+            due = full or time.monotonic() - self._last_flush >= self.flush_interval
+
+        if self._thread is None:
+            if due:
+                self.flush()
+            return
+
+        if not self._thread.is_alive():
+            # A thread não sobrevive a um fork (ex.: gunicorn --preload)
+            self.start()
+
+        if full:
+            self._wake.set()
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name='last-seen-flush', daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while True:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
+
+    def flush(self):
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self._last_flush = time.monotonic()
+
+        if not pending:
+            return 0
+
+        try:
+            return self.writer(pending, self.granularity)
+        except Exception as e:
+            # last-seen é best effort: uma falha não deve derrubar a requisição
+            logger.error(f"Erro ao gravar last_seen de {len(pending)} usuários: {e}")
+            return 0
+
+
+_buffer = None
+
+
+def get_last_seen_buffer():
+    global _buffer
+
+    if _buffer is None:
+        from django.conf import settings
+
+        _buffer = LastSeenBuffer(
+            flush_interval=settings.LAST_SEEN_FLUSH_INTERVAL,
+            max_entries=settings.LAST_SEEN_FLUSH_SIZE,
+            granularity=settings.LAST_SEEN_GRANULARITY,
+        )
+        _buffer.start()
+        atexit.register(_buffer.flush)
+
+    return _buffer
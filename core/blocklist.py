@@ -0,0 +1,236 @@
+"""
+Lista de senhas vazadas/comuns em um arquivo binário ordenado e mapeado em
+memória (mmap).
+
+Formato: cabeçalho de 16 bytes (MAGIC, versão, tamanho do registro, total)
+seguido dos registros ordenados, cada um com os primeiros bytes do SHA-1 da
+senha. A busca é binária sobre o mmap, então todos os workers compartilham o
+arquivo pelo page cache do sistema e a abertura não lê o arquivo inteiro.
+"""
+import gzip
+import hashlib
+import heapq
+import logging
+import mmap
+import os
+import re
+import shutil
+import struct
+import tempfile
+from itertools import chain
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b'PWBL'
+FORMAT_VERSION = 1
+HEADER = struct.Struct('<4sHHQ')
+
+# 8 bytes de SHA-1: colisão acidental desprezível mesmo com bilhões de entradas
+DEFAULT_DIGEST_SIZE = 8
+
+SHA1_LINE = re.compile(r'^[0-9A-Fa-f]{40}(:\d+)?$')
+
+
+def password_digest(password, digest_size=DEFAULT_DIGEST_SIZE):
+    return hashlib.sha1(password.encode('utf-8')).digest()[:digest_size]
+
+
+class PasswordBlocklist:
+
+    def __init__(self, path):
+        self.path = path
+
+        with open(path, 'rb') as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, self.digest_size, self.count = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            self._mm.close()
+            raise ValueError(f"Arquivo de blocklist inválido: {path}")
+
+        if len(self._mm) != HEADER.size + self.count * self.digest_size:
+            self._mm.close()
+            raise ValueError(f"Arquivo de blocklist truncado: {path}")
+
+    def __len__(self):
+        return self.count
+
+    def __contains__(self, password):
+        if self._contains_digest(password_digest(password, self.digest_size)):
+            return True
+
+        # Listas em texto (ex.: a do Django) são em minúsculas
+        lowered = password.lower()
+        return lowered != password and self._contains_digest(
+            password_digest(lowered, self.digest_size)
+        )
+
+    def _contains_digest(self, digest):
+        mm, size = self._mm, self.digest_size
+        lo, hi = 0, self.count
+
+        while lo < hi:
+            mid = (lo + hi) // 2
+            start = HEADER.size + mid * size
+            record = mm[start:start + size]
+
+            if record < digest:
+                lo = mid + 1
+            elif record > digest:
+                hi = mid
+            else:
+                return True
+
+        return False
+
+    def close(self):
+        self._mm.close()
+
+
+class EmptyBlocklist:
+    count = 0
+
+    def __len__(self):
+        return 0
+
+    def __contains__(self, password):
+        return False
+
+
+_blocklist = None
+
+
+def get_password_blocklist():
+    """Blocklist do processo; vazia se PASSWORD_BLOCKLIST_PATH não existir."""
+    global _blocklist
+
+    if _blocklist is None:
+        from django.conf import settings
+
+        path = settings.PASSWORD_BLOCKLIST_PATH
+        if path and os.path.exists(path):
+            _blocklist = PasswordBlocklist(path)
+        else:
+            logger.warning(f"Blocklist de senhas não encontrada em {path}")
+            _blocklist = EmptyBlocklist()
+
+    return _blocklist
+
+
+class BlocklistPasswordValidator:
+    """
+    Substituto do CommonPasswordValidator do Django (createsuperuser, admin)
+    que consulta o arquivo mapeado em vez de carregar o .gz em cada processo.
+    """
+
+    _fallback = None
+
+    def validate(self, password, user=None):
+        from django.contrib.auth.password_validation import CommonPasswordValidator
+        from django.core.exceptions import ValidationError
+
+        blocklist = get_password_blocklist()
+
+        # Sem o arquivo gerado, mantém a verificação padrão do Django
+        if not len(blocklist):
+            if self._fallback is None:
+                self._fallback = CommonPasswordValidator()
+            return self._fallback.validate(password, user)
+
+        if password in blocklist:
+            raise ValidationError(
+                "Senha muito comum, escolha uma senha mais segura",
+                code='password_too_common',
+            )
+
+    def get_help_text(self):
+        return "Sua senha não pode ser uma senha comum ou vazada."
+
+
+def iter_source_digests(path, digest_size=DEFAULT_DIGEST_SIZE):
+    """
+    Lê uma fonte em texto (opcionalmente .gz): uma senha por linha ou, no
+    formato do Have I Been Pwned, "SHA1:contagem". O formato é detectado pela
+    primeira linha.
+    """
+    opener = gzip.open if str(path).endswith('.gz') else open
+
+    with opener(path, 'rt', encoding='utf-8', errors='surrogateescape') as f:
+        hashed = None
+        for line in f:
+            line = line.rstrip('\r\n')
+            if not line:
+                continue
+
+            if hashed is None:
+                hashed = SHA1_LINE.match(line) is not None
+
+            if hashed:
+                yield bytes.fromhex(line[:40])[:digest_size]
+            else:
+                yield hashlib.sha1(
+                    line.encode('utf-8', 'surrogateescape')
+                ).digest()[:digest_size]
+
+
+def _write_run(digests, directory):
+    fd, path = tempfile.mkstemp(dir=directory, suffix='.run')
+    with os.fdopen(fd, 'wb') as f:
+        f.write(b''.join(sorted(set(digests))))
+    return path
+
+
+def _read_run(path, digest_size, block_records=65536):
+    with open(path, 'rb') as f:
+        while True:
+            block = f.read(digest_size * block_records)
+            if not block:
+                return
+            for start in range(0, len(block), digest_size):
+                yield block[start:start + digest_size]
+
+
+def build_blocklist(sources, output, digest_size=DEFAULT_DIGEST_SIZE, chunk_size=1_000_000):
+    """
+    Gera o arquivo a partir das fontes com ordenação externa (blocos ordenados
+    em disco + merge), sem carregar o corpus inteiro em memória. O arquivo
+    final é trocado atomicamente. Retorna o total de registros distintos.
+    """
+    output = os.path.abspath(output)
+    directory = os.path.dirname(output)
+    os.makedirs(directory, exist_ok=True)
+
+    work_dir = tempfile.mkdtemp(dir=directory)
+    try:
+        runs, chunk = [], []
+        digests = chain.from_iterable(
+            iter_source_digests(source, digest_size) for source in sources
+        )
+        for digest in digests:
+            chunk.append(digest)
+            if len(chunk) >= chunk_size:
+                runs.append(_write_run(chunk, work_dir))
+                chunk = []
+        runs.append(_write_run(chunk, work_dir))
+
+        partial = os.path.join(work_dir, 'blocklist.bin')
+        count, previous = 0, None
+
+        with open(partial, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, FORMAT_VERSION, digest_size, 0))
+
+            merged = heapq.merge(*(_read_run(run, digest_size) for run in runs))
+            for digest in merged:
+                if digest != previous:
+                    f.write(digest)
+                    count += 1
+                    previous = digest
+
+            f.seek(0)
+            f.write(HEADER.pack(MAGIC, FORMAT_VERSION, digest_size, count))
+
+        os.replace(partial, output)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    return count
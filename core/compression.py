@@ -0,0 +1,168 @@
+import hashlib
+import threading
+import zlib
+from collections import OrderedDict
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - dependência opcional
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - dependência opcional
+    zstandard = None
+
+
+class _Compressor:
+    def __init__(self, compress, flush):
+        self.compress = compress
+        self.flush = flush
+
+
+def _gzip(level):
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    return _Compressor(compressor.compress, compressor.flush)
+
+
+def _brotli(level):
+    compressor = brotli.Compressor(quality=level)
+    return _Compressor(compressor.process, compressor.finish)
+
+
+def _zstd(level):
+    compressor = zstandard.ZstdCompressor(level=level).compressobj()
+    return _Compressor(compressor.compress, compressor.flush)
+
+
+# Ordem de preferência do servidor quando o cliente aceita mais de uma
+ENCODERS = OrderedDict(
+    (name, (factory, level))
+    for name, factory, level, available in (
+        ('zstd', _zstd, 3, zstandard is not None),
+        ('br', _brotli, 5, brotli is not None),
+        ('gzip', _gzip, 6, True),
+    )
+    if available
+)
+
+INCOMPRESSIBLE_TYPES = (
+    'image/', 'video/', 'audio/', 'font/woff',
+    'application/zip', 'application/gzip', 'application/x-gzip',
+    'application/zstd', 'application/x-brotli', 'application/octet-stream',
+)
+
+
+def negotiate(accept_encoding):
+    """Escolhe a codificação pelo Accept-Encoding (q-values), ou None."""
+    accepted = {}
+    for part in accept_encoding.split(','):
+        token, _, params = part.strip().partition(';')
+        token = token.strip().lower()
+        if not token:
+            continue
+
+        quality = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[token] = quality
+
+    best, best_quality = None, 0.0
+    for name in ENCODERS:
+        quality = accepted.get(name, accepted.get('*', 0.0))
+        if quality > best_quality:
+            best, best_quality = name, quality
+
+    return best
+
+
+def is_compressible(content_type):
+    return not content_type.startswith(INCOMPRESSIBLE_TYPES)
+
+
+def cache_control_directives(value):
+    """Nomes das diretivas de um Cache-Control, em minúsculas."""
+    return {
+        part.split('=', 1)[0].strip().lower()
+        for part in value.split(',')
+        if part.strip()
+    }
+
+
+def compress(data, encoding):
+    factory, level = ENCODERS[encoding]
+    compressor = factory(level)
+    return compressor.compress(data) + compressor.flush()
+
+
+def compress_stream(chunks, encoding):
+    factory, level = ENCODERS[encoding]
+    compressor = factory(level)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+async def compress_async_stream(chunks, encoding):
+    factory, level = ENCODERS[encoding]
+    compressor = factory(level)
+    async for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+class VariantCache:
+    """
+    LRU em memória das variantes comprimidas, indexado pelo hash do corpo e
+    pela codificação. Corpos repetidos (schema OpenAPI, páginas populares) são
+    comprimidos uma vez por worker; calcular o hash custa bem menos que comprimir.
+    Limitado por número de entradas e pelo total de bytes guardados.
+    """
+
+    def __init__(self, max_entries, max_body_size, max_bytes):
+        self.max_entries = max_entries
+        self.max_body_size = max_body_size
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def compress(self, data, encoding):
+        if len(data) > self.max_body_size or not self.max_entries:
+            return compress(data, encoding)
+
+        key = (hashlib.blake2b(data, digest_size=16).digest(), encoding)
+        with self._lock:
+            compressed = self._entries.get(key)
+            if compressed is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return compressed
+
+        compressed = compress(data, encoding)
+
+        with self._lock:
+            self.misses += 1
+            if len(compressed) > self.max_bytes or key in self._entries:
+                return compressed
+
+            self._entries[key] = compressed
+            self.size += len(compressed)
+            while len(self._entries) > self.max_entries or self.size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.size -= len(evicted)
+
+        return compressed
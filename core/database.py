@@ -1,25 +1,34 @@
 from sqlalchemy import create_engine, Column, Integer, String, DateTime, Boolean
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, scoped_session
+from contextlib import contextmanager
 from datetime import datetime
 from decouple import config
 import logging
 
 logger = logging.getLogger(__name__)
 
-DATABASE_URL = (
-    f"postgresql://{config('DB_USER')}:{config('DB_PASSWORD')}"
-    f"@{config('DB_HOST')}:{config('DB_PORT')}/{config('DB_NAME')}"
-)
 
-engine = create_engine(
-    DATABASE_URL,
-    echo=config('DEBUG', default=False, cast=bool),  # Log SQL em desenvolvimento
-    pool_size=10,           # Número de conexões no pool
-    max_overflow=20,        # Conexões extras permitidas
-    pool_pre_ping=True,     # Verifica conexão antes de usar
-    pool_recycle=3600,      # Recicla conexões após 1 hora
-)
+def build_database_url(database_name=None):
+    return (
+        f"postgresql://{config('DB_USER')}:{config('DB_PASSWORD')}"
+        f"@{config('DB_HOST')}:{config('DB_PORT')}/{database_name or config('DB_NAME')}"
+    )
+
+
+def build_engine(database_url):
+    return create_engine(
+        database_url,
+        echo=config('DEBUG', default=False, cast=bool),  # Log SQL em desenvolvimento
+        pool_size=10,           # Número de conexões no pool
+        max_overflow=20,        # Conexões extras permitidas
+        pool_pre_ping=True,     # Verifica conexão antes de usar
+        pool_recycle=3600,      # Recicla conexões após 1 hora
+    )
+
+
+DATABASE_URL = build_database_url()
+engine = build_engine(DATABASE_URL)
 
 session_factory = sessionmaker(
     autocommit=False,
@@ -47,6 +56,36 @@ def init_database():
         raise
 
 
+def use_database(database_name):
+    """Aponta engine e SessionLocal para outro banco (ex.: o banco de teste de cada worker)."""
+    global engine
+
+    SessionLocal.remove()
+    engine.dispose()
+    engine = build_engine(build_database_url(database_name))
+    session_factory.configure(bind=engine)
+
+
+@contextmanager
+def rollback_session():
+    """
+    Liga o SessionLocal a uma transação externa desfeita ao final, em vez de
+    recriar as tabelas. Commits feitos pelo código viram savepoints.
+    """
+    connection = engine.connect()
+    transaction = connection.begin()
+    SessionLocal.remove()
+    session_factory.configure(bind=connection, join_transaction_mode='create_savepoint')
+
+    try:
+        yield connection
+    finally:
+        SessionLocal.remove()
+        session_factory.configure(bind=engine, join_transaction_mode='conservative_savepoint')
+        transaction.rollback()
+        connection.close()
+
+
 def reset_database():
     if config('DEBUG', default=False, cast=bool):
         Base.metadata.drop_all(bind=engine)
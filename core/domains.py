@@ -0,0 +1,154 @@
+"""
+Política de domínios de email (ex.: provedores de email temporário).
+
+As listas são carregadas de arquivos texto, um domínio por linha:
+
+    mailinator.com      o domínio e todos os subdomínios
+    *.example.net       apenas os subdomínios
+    # comentário
+
+A lista de permitidos tem a mesma sintaxe e vence a de bloqueados: um
+domínio que casa com qualquer regra de permissão, em qualquer nível, é
+aceito mesmo que também case com um bloqueio. A consulta percorre os
+sufixos do domínio em dicionários, então custa O(número de rótulos)
+independentemente do tamanho das listas.
+"""
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+ALLOW, DENY = True, False
+
+
+def read_domain_file(path):
+    """Lê um arquivo de domínios; retorna ([domínios], [curingas])."""
+    domains, wildcards = [], []
+
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            entry = line.split('#', 1)[0].strip().lower().rstrip('.')
+            if not entry:
+                continue
+
+            if entry.startswith('*.'):
+                wildcards.append(entry[2:])
+            else:
+                domains.append(entry)
+
+    return domains, wildcards
+
+
+class DomainPolicy:
+
+    def __init__(self, deny=(), allow=(), deny_wildcards=(), allow_wildcards=()):
+        # domínio -> ALLOW/DENY, aplicado ao próprio domínio e aos subdomínios
+        self._domains = dict.fromkeys(deny, DENY)
+        self._domains.update(dict.fromkeys(allow, ALLOW))
+
+        # domínio -> ALLOW/DENY, aplicado apenas aos subdomínios
+        self._wildcards = dict.fromkeys(deny_wildcards, DENY)
+        self._wildcards.update(dict.fromkeys(allow_wildcards, ALLOW))
+
+    @classmethod
+    def from_files(cls, deny_path=None, allow_path=None):
+        deny, deny_wildcards, allow, allow_wildcards = [], [], [], []
+
+        if deny_path and os.path.exists(deny_path):
+            deny, deny_wildcards = read_domain_file(deny_path)
+
+        if allow_path and os.path.exists(allow_path):
+            allow, allow_wildcards = read_domain_file(allow_path)
+
+        return cls(deny, allow, deny_wildcards, allow_wildcards)
+
+    def __len__(self):
+        return len(self._domains) + len(self._wildcards)
+
+    def is_denied(self, domain):
+        domain = domain.lower().rstrip('.')
+
+        domains, wildcards = self._domains, self._wildcards
+
+        # Permissão em qualquer nível vence; bloqueio só vale sem nenhuma
+        action = domains.get(domain)
+        if action is ALLOW:
+            return False
+        denied = action is DENY
+
+        index = domain.find('.')
+        while index != -1:
+            suffix = domain[index + 1:]
+
+            for action in (domains.get(suffix), wildcards.get(suffix)):
+                if action is ALLOW:
+                    return False
+                denied = denied or action is DENY
+
+            index = domain.find('.', index + 1)
+
+        return denied
+
+
+class DomainPolicyStore:
+    """
+    Mantém a política carregada e a recarrega quando os arquivos mudam. A
+    verificação (stat dos arquivos) acontece no máximo a cada check_interval
+    segundos; a troca é atômica, sem reiniciar os workers.
+    """
+
+    def __init__(self, deny_path, allow_path, check_interval):
+        self.deny_path = deny_path
+        self.allow_path = allow_path
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._policy = None
+        self._signature = None
+        self._next_check = 0.0
+
+    def _file_signature(self):
+        signature = []
+        for path in (self.deny_path, self.allow_path):
+            try:
+                stat = os.stat(path)
+                signature.append((stat.st_mtime_ns, stat.st_size, stat.st_ino))
+            except (OSError, TypeError):
+                signature.append(None)
+        return tuple(signature)
+
+    def get(self):
+        now = time.monotonic()
+        if self._policy is not None and now < self._next_check:
+            return self._policy
+
+        with self._lock:
+            if self._policy is None or now >= self._next_check:
+                self._next_check = now + self.check_interval
+
+                signature = self._file_signature()
+                if signature != self._signature:
+                    self._policy = DomainPolicy.from_files(self.deny_path, self.allow_path)
+                    self._signature = signature
+                    logger.info(f"Política de domínios carregada: {len(self._policy)} regras")
+
+        return self._policy
+
+
+_store = None
+
+
+def get_domain_policy():
+    global _store
+
+    if _store is None:
+        from django.conf import settings
+
+        _store = DomainPolicyStore(
+            settings.EMAIL_DOMAIN_DENYLIST_PATH,
+            settings.EMAIL_DOMAIN_ALLOWLIST_PATH,
+            settings.EMAIL_DOMAIN_POLICY_CHECK_INTERVAL,
+        )
+
+    return _store.get()
@@ -0,0 +1,152 @@
+"""
+Liveness e readiness.
+
+/healthz é respondido pelo LivenessApp, que embrulha a aplicação WSGI: não
+passa por middlewares, URLconf nem faz I/O. /readyz testa banco (Django e
+pool do SQLAlchemy), cache e broker do Celery; o resultado fica em memória
+por READINESS_CACHE_SECONDS para que probes frequentes não gerem carga.
+"""
+import logging
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+
+from django.conf import settings
+from django.http import JsonResponse
+
+logger = logging.getLogger(__name__)
+
+
+class LivenessApp:
+    """Responde /healthz antes do Django; o resto segue para `application`."""
+
+    BODY = b'{"status": "ok"}'
+    HEADERS = [
+        ('Content-Type', 'application/json'),
+        ('Content-Length', str(len(BODY))),
+        ('Cache-Control', 'no-store'),
+    ]
+
+    def __init__(self, application, paths=('/healthz', '/healthz/')):
+        self.application = application
+        self.paths = frozenset(paths)
+
+    def __call__(self, environ, start_response):
+        if environ.get('PATH_INFO') in self.paths:
+            start_response('200 OK', list(self.HEADERS))
+            return [self.BODY]
+        return self.application(environ, start_response)
+
+
+def probe_database():
+    from django.db import connection
+
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT 1')
+
+
+def probe_sqlalchemy():
+    from sqlalchemy import text
+
+    from core import database
+
+    pool = database.engine.pool
+    with database.engine.connect() as conn:
+        conn.execute(text('SELECT 1'))
+
+    return {'pool': {'size': pool.size(), 'checked_out': pool.checkedout(), 'overflow': pool.overflow()}}
+
+
+def probe_cache():
+    from django.core.cache import cache
+
+    key, token = 'readyz:probe', uuid.uuid4().hex
+    cache.set(key, token, timeout=30)
+    if cache.get(key) != token:
+        raise RuntimeError("Cache não devolveu o valor gravado")
+
+
+def probe_broker():
+    url = settings.CELERY_BROKER_URL
+    if not url:
+        return {'status': 'skipped'}
+
+    from kombu import Connection
+
+    timeout = settings.READINESS_PROBE_TIMEOUT
+    with Connection(url, connect_timeout=timeout, transport_options={'socket_timeout': timeout}) as conn:
+        conn.ensure_connection(max_retries=1, timeout=timeout)
+
+
+DEFAULT_PROBES = {
+    'database': probe_database,
+    'sqlalchemy': probe_sqlalchemy,
+    'cache': probe_cache,
+    'broker': probe_broker,
+}
+
+
+class ReadinessCheck:
+    """
+    Executa os probes e guarda o resultado por `ttl` segundos. Requisições
+    simultâneas com o resultado vencido esperam uma única execução.
+    """
+
+    def __init__(self, probes, ttl):
+        self.probes = probes
+        self.ttl = ttl
+        self._result = None
+        self._expires_at = 0.0
+        self._lock = threading.Lock()
+
+    def get(self):
+        if time.monotonic() < self._expires_at:
+            return self._result, True
+
+        with self._lock:
+            if time.monotonic() < self._expires_at:
+                return self._result, True
+
+            self._result = self.run()
+            self._expires_at = time.monotonic() + self.ttl
+            return self._result, False
+
+    def run(self):
+        checks = {}
+        for name, probe in self.probes.items():
+            started = time.perf_counter()
+            try:
+                result = {'status': 'ok', **(probe() or {})}
+            except Exception as e:
+                logger.warning(f"Readiness: {name} indisponível: {e}")
+                result = {'status': 'error', 'error': type(e).__name__}
+            result['latency_ms'] = round((time.perf_counter() - started) * 1000, 2)
+            checks[name] = result
+
+        ready = all(check['status'] != 'error' for check in checks.values())
+        return {
+            'status': 'ok' if ready else 'unavailable',
+            'checked_at': datetime.now(timezone.utc).isoformat(),
+            'checks': checks,
+        }
+
+
+_readiness = None
+
+
+def get_readiness_check():
+    global _readiness
+
+    if _readiness is None:
+        _readiness = ReadinessCheck(DEFAULT_PROBES, settings.READINESS_CACHE_SECONDS)
+
+    return _readiness
+
+
+def readiness_view(request):
+    result, cached = get_readiness_check().get()
+
+    response = JsonResponse(dict(result, cached=cached), status=200 if result['status'] == 'ok' else 503)
+    response['Cache-Control'] = 'no-store'
+    return response
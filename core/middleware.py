@@ -1,9 +1,11 @@
 import time
+import uuid
 import logging
 import json
 from django.utils.deprecation import MiddlewareMixin
 from django.http import JsonResponse
 from rest_framework import status
+from core.versioning import negotiate_version
 
 logger = logging.getLogger(__name__)
 
@@ -65,29 +67,8 @@ class SecurityHeadersMiddleware(MiddlewareMixin):
 class APIVersionMiddleware(MiddlewareMixin):
     
     def process_request(self, request):
-        version = request.META.get('HTTP_X_API_VERSION')
-        
-        if not version:
-            path_parts = request.path.split('/')
-            for part in path_parts:
-                if part.startswith('v') and part[1:].replace('.', '').isdigit():
-                    version = part[1:]
-                    break
-        
-        if not version:
-            version = '1.0'
-        
-        valid_versions = ['1.0', '1.1', '2.0']
-        if version not in valid_versions:
-            return JsonResponse(
-                {
-                    'error': f'Versão da API {version} não suportada',
-                    'supported_versions': valid_versions
-                },
-                status=status.HTTP_400_BAD_REQUEST
-            )
-        
-        request.api_version = version
+        # /api/v1/ e /api/v2/ são resolvidos pelos URLconfs; aqui só o header
+        return negotiate_version(request)
 
 
 class JSONRequestMiddleware(MiddlewareMixin):
@@ -112,7 +93,7 @@ class CORSMiddleware(MiddlewareMixin):
     def process_response(self, request, response):
         response['Access-Control-Allow-Origin'] = '*'
         response['Access-Control-Allow-Methods'] = 'GET, POST, PUT, PATCH, DELETE, OPTIONS'
-        response['Access-Control-Allow-Headers'] = 'Content-Type, Authorization, X-API-Version'
+        response['Access-Control-Allow-Headers'] = 'Content-Type, Authorization, X-API-Version, Idempotency-Key'
         response['Access-Control-Max-Age'] = '3600'
         
         return response
@@ -187,20 +168,199 @@ class RateLimitMiddleware(MiddlewareMixin):
         self.requests[ip].append((now, 1))
 
 
-class UserActivityMiddleware(MiddlewareMixin):
+class APIFastPathMiddleware:
+    """
+    Substitui logging, security headers, versão, request ID e manutenção do
+    perfil de API: IP, ID, versão e tempo são calculados uma única vez por
+    requisição e os headers fixos são pré-computados na inicialização.
+    
+    Não herda de MiddlewareMixin, que testa iscoroutinefunction a cada chamada.
+    """
+    
+    sync_capable = True
+    async_capable = False
+    
+    STATIC_HEADERS = (
+        ('X-Content-Type-Options', 'nosniff'),
+        ('X-Frame-Options', 'DENY'),
+        ('X-XSS-Protection', '1; mode=block'),
+    )
+    SECURE_HEADERS = (
+        ('Strict-Transport-Security', 'max-age=31536000; includeSubDomains'),
+    )
+    
+    def __init__(self, get_response):
+        from django.conf import settings
+        
+        self.get_response = get_response
+        self.maintenance_mode = getattr(settings, 'MAINTENANCE_MODE', False)
+    
+    def __call__(self, request):
+        response = self.process_request(request)
+        if response is None:
+            response = self.get_response(request)
+        return self.process_response(request, response)
     
     def process_request(self, request):
-        if hasattr(request, 'user') and request.user.is_authenticated:
+        request._start_time = time.perf_counter()
+        request.client_ip = RequestLoggingMiddleware.get_client_ip(request)
+        request.id = str(uuid.uuid4())
+        
+        response = negotiate_version(request)
+        if response is not None:
+            return response
+        
+        if self.maintenance_mode and not self._is_staff(request):
+            return JsonResponse(
+                {
+                    'error': 'Sistema em manutenção',
+                    'message': 'Voltaremos em breve. Desculpe o inconveniente.',
+                    'retry_after': 3600
+                },
+                status=status.HTTP_503_SERVICE_UNAVAILABLE
+            )
+    
+    @staticmethod
+    def _is_staff(request):
+        # Sem AuthenticationMiddleware neste perfil: request.user só existe depois
+        # da autenticação do DRF, na view. Em manutenção o JWT é validado aqui.
+        from rest_framework.exceptions import APIException
+        from rest_framework.settings import api_settings
+        
+        for authentication_class in api_settings.DEFAULT_AUTHENTICATION_CLASSES:
+            try:
+                result = authentication_class().authenticate(request)
+            except APIException:
+                return False
+            if result is not None:
+                return bool(result[0].is_staff)
+        
+        return False
+    
+    def process_response(self, request, response):
+        headers = response.headers
+        for name, value in self.STATIC_HEADERS:
+            headers[name] = value
+        
+        if request.is_secure():
+            for name, value in self.SECURE_HEADERS:
+                headers[name] = value
+        
+        request_id = getattr(request, 'id', None)
+        if request_id is not None:
+            headers['X-Request-ID'] = request_id
+        
+        start = getattr(request, '_start_time', None)
+        if start is not None and logger.isEnabledFor(logging.INFO):
+            duration = time.perf_counter() - start
+            logger.info(
+                "Response: %s %s - %s (%.2fs)",
+                request.method, request.path, response.status_code, duration,
+                extra={
+                    'method': request.method,
+                    'path': request.path,
+                    'status_code': response.status_code,
+                    'duration': duration,
+                    'ip': request.client_ip,
+                    'request_id': request_id,
+                }
+            )
+        
+        return response
+
+
+class CompressionMiddleware(MiddlewareMixin):
+    
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        from django.conf import settings
+        from core.compression import VariantCache
+        
+        self.min_size = settings.COMPRESSION_MIN_SIZE
+        self.variants = VariantCache(
+            max_entries=settings.COMPRESSION_CACHE_ENTRIES,
+            max_body_size=settings.COMPRESSION_CACHE_MAX_BODY,
+            max_bytes=settings.COMPRESSION_CACHE_MAX_BYTES,
+        )
+    
+    def process_response(self, request, response):
+        from django.utils.cache import patch_vary_headers
+        from core import compression
+        
+        if response.has_header('Content-Encoding'):
+            return response
+        
+        if not compression.is_compressible(response.get('Content-Type', '')):
+            return response
+        
+        # BREACH: corpo com segredo (tokens) e eco da entrada não é comprimido.
+        # Respostas com credenciais são marcadas private/no-store (never_cache).
+        cache_control = compression.cache_control_directives(response.get('Cache-Control', ''))
+        if cache_control & {'private', 'no-store'}:
+            return response
+        
+        if not response.streaming and len(response.content) < self.min_size:
+            return response
+        
+        patch_vary_headers(response, ('Accept-Encoding',))
+        
+        encoding = compression.negotiate(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        if encoding is None:
+            return response
+        
+        if response.streaming:
+            if response.is_async:
+                response.streaming_content = compression.compress_async_stream(
+                    response.streaming_content, encoding
+                )
+            else:
+                response.streaming_content = compression.compress_stream(
+                    response.streaming_content, encoding
+                )
+            del response['Content-Length']
+        else:
+            # Só corpos compartilháveis entram no cache; os por usuário só girariam o LRU
+            if 'public' in cache_control:
+                compressed = self.variants.compress(response.content, encoding)
+            else:
+                compressed = compression.compress(response.content, encoding)
+            
+            if len(compressed) >= len(response.content):
+                return response
+            
+            response.content = compressed
+            response['Content-Length'] = str(len(compressed))
+        
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
+        
+        response['Content-Encoding'] = encoding
+        return response
+
+
+class UserActivityMiddleware(MiddlewareMixin):
+    
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        from django.conf import settings
+        from datetime import timedelta
+        from core.activity import get_last_seen_buffer
+        
+        self.buffer = get_last_seen_buffer()
+        self.granularity = timedelta(seconds=settings.LAST_SEEN_GRANULARITY)
+    
+    def process_response(self, request, response):
+        # O DRF propaga o usuário autenticado via JWT para o HttpRequest
+        user = getattr(request, 'user', None)
+        
+        if user is not None and user.is_authenticated:
             from django.utils import timezone
-            from core.database import SessionLocal, UserModel
             
-            db = SessionLocal()
-            try:
-                user = db.query(UserModel).filter(
-                    UserModel.id == request.user.id
-                ).first()
-                
-                if user:
-                    pass
-            finally:
-                db.close()
+            now = timezone.now()
+            last_seen = getattr(user, 'last_seen_at', None)
+            
+            if last_seen is None or now - last_seen > self.granularity:
+                self.buffer.record(user.id, now)
+        
+        return response
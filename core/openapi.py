@@ -0,0 +1,185 @@
+"""
+Schema OpenAPI pré-calculado.
+
+O drf_yasg só é importado quando o schema é gerado: no build
+(`manage.py build_openapi_schema`) ou no primeiro acesso à documentação.
+O JSON fica em memória e em OPENAPI_SCHEMA_PATH e é servido com ETag; as
+páginas do Swagger UI e do ReDoc só renderizam o template e apontam para ele.
+"""
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+from types import SimpleNamespace
+
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseNotModified
+from django.template.loader import render_to_string
+from django.utils.cache import patch_cache_control
+from django.utils.http import parse_etags
+
+logger = logging.getLogger(__name__)
+
+API_INFO = {
+    'title': "Users API",
+    'default_version': 'v1',
+    'description': "API RESTful para gerenciamento de usuários com Django, PostgreSQL e SQLAlchemy",
+    'terms_of_service': "https://www.google.com/policies/terms/",
+}
+CONTACT_EMAIL = "contato@example.com"
+LICENSE_NAME = "MIT License"
+
+
+def generate_schema():
+    """Introspecta views e serializers e devolve o schema em JSON (bytes)."""
+    from drf_yasg import openapi
+    from drf_yasg.app_settings import swagger_settings
+    from drf_yasg.codecs import OpenAPICodecJson
+
+    info = openapi.Info(
+        contact=openapi.Contact(email=CONTACT_EMAIL),
+        license=openapi.License(name=LICENSE_NAME),
+        **API_INFO,
+    )
+    generator = swagger_settings.DEFAULT_GENERATOR_CLASS(info)
+    schema = generator.get_schema(request=None, public=True)
+
+    return OpenAPICodecJson(validators=[]).encode(schema)
+
+
+def swagger_auto_schema(**overrides):
+    """
+    Equivalente ao drf_yasg.utils.swagger_auto_schema para métodos de APIView,
+    sem importar o drf_yasg: só anota o método, e o gerador lê a anotação.
+    """
+    def decorator(view_method):
+        data = getattr(view_method, '_swagger_auto_schema', {})
+        data.update({key: value for key, value in overrides.items() if value is not None})
+        view_method._swagger_auto_schema = data
+        return view_method
+
+    return decorator
+
+
+def make_etag(body):
+    return '"{}"'.format(hashlib.blake2b(body, digest_size=16).hexdigest())
+
+
+class SchemaCache:
+    """
+    Schema do processo. Na primeira leitura usa o arquivo (se `reuse_file`)
+    ou gera e grava; depois disso serve sempre da memória.
+    """
+
+    def __init__(self, path, reuse_file=True, generator=generate_schema):
+        self.path = path
+        self.reuse_file = reuse_file
+        self.generator = generator
+        self._entry = None
+        self._lock = threading.Lock()
+
+    def get(self):
+        entry = self._entry
+        if entry is None:
+            with self._lock:
+                if self._entry is None:
+                    body = self._read() if self.reuse_file else None
+                    if body is None:
+                        body = self._generate()
+                    self._entry = (body, make_etag(body))
+                entry = self._entry
+        return entry
+
+    def build(self):
+        """Regera o schema, grava o arquivo e substitui a cópia em memória."""
+        body = self.generator()
+        self._write(body)
+        with self._lock:
+            self._entry = (body, make_etag(body))
+        return body
+
+    def _generate(self):
+        body = self.generator()
+        try:
+            self._write(body)
+        except OSError as e:
+            logger.warning(f"Não foi possível gravar o schema OpenAPI em {self.path}: {e}")
+        return body
+
+    def _read(self):
+        if not self.path:
+            return None
+        try:
+            with open(self.path, 'rb') as f:
+                return f.read() or None
+        except FileNotFoundError:
+            return None
+
+    def _write(self, body):
+        if not self.path:
+            return
+
+        directory = os.path.dirname(self.path) or '.'
+        os.makedirs(directory, exist_ok=True)
+
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(body)
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+
+_schema_cache = None
+
+
+def get_schema_cache():
+    global _schema_cache
+
+    if _schema_cache is None:
+        _schema_cache = SchemaCache(settings.OPENAPI_SCHEMA_PATH, settings.OPENAPI_SCHEMA_REUSE_FILE)
+
+    return _schema_cache
+
+
+def schema_view(request):
+    body, etag = get_schema_cache().get()
+
+    if etag in parse_etags(request.META.get('HTTP_IF_NONE_MATCH', '')):
+        response = HttpResponseNotModified()
+    else:
+        response = HttpResponse(body, content_type='application/json')
+
+    response['ETag'] = etag
+    # O cliente sempre revalida; com o ETag a resposta é um 304 vazio
+    patch_cache_control(response, public=True, no_cache=True)
+    return response
+
+
+def _ui_view(renderer_name):
+    def view(request):
+        # Compatibilidade com quem ainda busca o schema em `?format=openapi`
+        if request.GET.get('format') == 'openapi':
+            return schema_view(request)
+
+        from drf_yasg import renderers
+
+        renderer = getattr(renderers, renderer_name)()
+        # set_context só lê título e versão; não precisa do schema inteiro
+        stub = SimpleNamespace(info=SimpleNamespace(
+            title=API_INFO['title'], version=API_INFO['default_version'],
+        ))
+        context = {'request': request}
+        renderer.set_context(context, stub)
+
+        return HttpResponse(render_to_string(renderer.template, context, request))
+
+    view.__name__ = renderer_name
+    return view
+
+
+swagger_view = _ui_view('SwaggerUIRenderer')
+redoc_view = _ui_view('ReDocRenderer')
@@ -1,12 +1,15 @@
 import bcrypt
-import re
 from typing import Tuple
 
+from django.conf import settings
+
+from core.validation import EMAIL_PATTERN, STRENGTH_RULES
+
 
 class PasswordSecurity:
     @staticmethod
     def hash_password(password: str) -> str:
-        salt = bcrypt.gensalt(rounds=12)
+        salt = bcrypt.gensalt(rounds=getattr(settings, 'BCRYPT_ROUNDS', 12))
         hashed = bcrypt.hashpw(password.encode("utf-8"), salt)
         return hashed.decode("utf-8")
 
@@ -16,31 +19,14 @@ class PasswordSecurity:
 
     @staticmethod
     def validate_password_strength(password: str) -> Tuple[bool, list]:
-        errors = []
-
-        if len(password) < 8:
-            errors.append("A senha deve ter no mínimo 8 caracteres")
-
-        if not re.search(r"[A-Z]", password):
-            errors.append("A senha deve conter pelo menos uma letra maiúscula")
-
-        if not re.search(r"[a-z]", password):
-            errors.append("A senha deve conter pelo menos uma letra minúscula")
-
-        if not re.search(r"\d", password):
-            errors.append("A senha deve conter pelo menos um número")
-
-        if not re.search(r'[!@#$%^&*(),.?":{}|<>]', password):
-            errors.append("A senha deve conter pelo menos um caractere especial")
-
+        errors = STRENGTH_RULES.check(password)
         return (len(errors) == 0, errors)
 
 
 class EmailSecurity:
     @staticmethod
     def is_valid_email(email: str) -> bool:
-        pattern = r"^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$"
-        return bool(re.match(pattern, email))
+        return EMAIL_PATTERN.match(email) is not None
 
     @staticmethod
     def normalize_email(email: str) -> str:
@@ -0,0 +1,82 @@
+"""
+Medição do boot de um worker WSGI.
+
+Roda `python -X importtime` num processo novo que carrega config.wsgi (e o
+URLconf, pago na primeira requisição) e devolve o tempo total, a memória
+residente e o custo de import por módulo e por pacote.
+"""
+import json
+import os
+import re
+import subprocess
+import sys
+
+IMPORTTIME_LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$')
+
+BOOT_SCRIPT = """
+import json, os, time
+started = time.perf_counter()
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', {settings!r})
+from config.wsgi import application
+if {load_urls!r}:
+    from django.urls import get_resolver
+    get_resolver().url_patterns
+elapsed = time.perf_counter() - started
+rss_kb = 0
+with open('/proc/self/status') as f:
+    for line in f:
+        if line.startswith('VmRSS:'):
+            rss_kb = int(line.split()[1])
+print(json.dumps({{'elapsed_s': elapsed, 'rss_kb': rss_kb}}))
+"""
+
+
+def parse_importtime(output):
+    """Linhas do -X importtime -> [(módulo, self µs, cumulativo µs, profundidade)]."""
+    modules = []
+    for line in output.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            modules.append((name, int(self_us), int(cumulative_us), len(indent) // 2))
+    return modules
+
+
+def group_by_package(modules):
+    packages = {}
+    for name, self_us, _, _ in modules:
+        package = name.split('.', 1)[0]
+        packages[package] = packages.get(package, 0) + self_us
+    return sorted(packages.items(), key=lambda item: item[1], reverse=True)
+
+
+def measure_startup(settings_module=None, load_urls=True, env=None):
+    """Sobe um interpretador novo e mede o boot. Retorna um dict com o relatório."""
+    settings_module = settings_module or os.environ.get('DJANGO_SETTINGS_MODULE', 'config.settings')
+    script = BOOT_SCRIPT.format(settings=settings_module, load_urls=load_urls)
+
+    process_env = dict(os.environ, **(env or {}))
+    process_env['DJANGO_SETTINGS_MODULE'] = settings_module
+
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', script],
+        capture_output=True, text=True, env=process_env,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Falha ao iniciar o worker:\n{result.stderr[-2000:]}")
+
+    summary = json.loads(result.stdout.strip().splitlines()[-1])
+    modules = parse_importtime(result.stderr)
+
+    return {
+        'elapsed_s': summary['elapsed_s'],
+        'rss_kb': summary['rss_kb'],
+        'import_s': sum(self_us for _, self_us, _, _ in modules) / 1e6,
+        'modules': len(modules),
+        'packages': group_by_package(modules),
+        'top_level': sorted(
+            ((name, cumulative) for name, _, cumulative, depth in modules if depth == 0),
+            key=lambda item: item[1], reverse=True,
+        ),
+        'loaded': sorted({name for name, _, _, _ in modules}),
+    }
@@ -0,0 +1,103 @@
+"""
+Regras de validação de senha e de formato de entrada, compiladas uma única vez.
+
+core.security (usado pelos serializers) e apps.users.validators delegam para
+este módulo; as mensagens de erro são as mesmas de antes.
+"""
+import re
+import string
+
+from core.blocklist import get_password_blocklist
+
+PASSWORD_MIN_LENGTH = 8
+PASSWORD_MAX_LENGTH = 128
+
+UPPERCASE = frozenset(string.ascii_uppercase)
+LOWERCASE = frozenset(string.ascii_lowercase)
+DIGITS = frozenset(string.digits)
+SPECIAL_CHARACTERS = frozenset('!@#$%^&*(),.?":{}|<>')
+EXTENDED_SPECIAL_CHARACTERS = SPECIAL_CHARACTERS | frozenset('_-+=[]\\;/~`')
+
+COMMON_PASSWORDS = frozenset([
+    'password', '12345678', 'qwerty', 'abc123', 'password123',
+    '123456789', '12345', '1234567', 'password1', '123456'
+])
+
+NUMERIC_SEQUENCE = re.compile(r'012|123|234|345|456|567|678|789|890')
+ALPHA_SEQUENCE = re.compile(r'abc|bcd|cde|def|efg|fgh|ghi|hij')
+
+EMAIL_PATTERN = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+NAME_PATTERN = re.compile(r"^[a-zA-ZÀ-ÿ\s'-]+$")
+USERNAME_PATTERN = re.compile(r'^[a-z0-9_-]+$')
+NON_DIGITS = re.compile(r'\D')
+
+
+class PasswordRules:
+    """
+    Conjunto de regras de senha. O conjunto de caracteres da senha é montado
+    uma vez e cada classe (maiúscula, minúscula, número, especial) é testada
+    contra ele, em vez de uma busca por regex para cada regra.
+    """
+
+    def __init__(self, special_characters, max_length=None,
+                 reject_common=False, reject_sequences=False):
+        self.special_characters = special_characters
+        self.max_length = max_length
+        self.reject_common = reject_common
+        self.reject_sequences = reject_sequences
+
+    @staticmethod
+    def is_common(password, lowered):
+        return lowered in COMMON_PASSWORDS or password in get_password_blocklist()
+
+    def check(self, password):
+        """Retorna a lista de erros, na mesma ordem das regras."""
+        errors = []
+
+        if len(password) < PASSWORD_MIN_LENGTH:
+            errors.append("A senha deve ter no mínimo 8 caracteres")
+
+        if self.max_length is not None and len(password) > self.max_length:
+            errors.append("A senha não pode ter mais de 128 caracteres")
+
+        chars = set(password)
+
+        if chars.isdisjoint(UPPERCASE):
+            errors.append("A senha deve conter pelo menos uma letra maiúscula")
+
+        if chars.isdisjoint(LOWERCASE):
+            errors.append("A senha deve conter pelo menos uma letra minúscula")
+
+        # \d também aceita dígitos não ASCII
+        if chars.isdisjoint(DIGITS) and not any(c.isdecimal() for c in chars):
+            errors.append("A senha deve conter pelo menos um número")
+
+        if chars.isdisjoint(self.special_characters):
+            errors.append("A senha deve conter pelo menos um caractere especial")
+
+        if self.reject_common or self.reject_sequences:
+            lowered = password.lower()
+
+            if self.reject_common and self.is_common(password, lowered):
+                errors.append("Senha muito comum, escolha uma senha mais segura")
+
+            if self.reject_sequences:
+                if NUMERIC_SEQUENCE.search(password):
+                    errors.append("Evite sequências numéricas óbvias")
+
+                if ALPHA_SEQUENCE.search(lowered):
+                    errors.append("Evite sequências alfabéticas óbvias")
+
+        return errors
+
+
+# Regras aplicadas no cadastro e na troca de senha (core.security)
+STRENGTH_RULES = PasswordRules(SPECIAL_CHARACTERS, reject_common=True)
+
+# Regras completas de apps.users.validators.PasswordValidator
+STRICT_RULES = PasswordRules(
+    EXTENDED_SPECIAL_CHARACTERS,
+    max_length=PASSWORD_MAX_LENGTH,
+    reject_common=True,
+    reject_sequences=True,
+)
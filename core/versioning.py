@@ -0,0 +1,59 @@
+from django.http import JsonResponse
+from rest_framework import status
+from rest_framework.versioning import BaseVersioning
+
+SUPPORTED_VERSIONS = ('1.0', '1.1', '2.0')
+DEFAULT_VERSION = '1.0'
+
+# Namespace das URLs versionadas (/api/v1/, /api/v2/) -> versão
+NAMESPACE_VERSIONS = {'v1': '1.0', 'v2': '2.0'}
+
+# Versão negociada via X-API-Version -> URLconf raiz que serve /api/users/.
+# O resolver de cada URLconf é compilado uma vez e fica em cache (get_resolver).
+HEADER_URLCONFS = {'2.0': 'config.urls_v2'}
+
+
+def negotiate_version(request):
+    """
+    Aplica o X-API-Version da requisição escolhendo o URLconf correspondente.
+    Retorna uma resposta 400 se a versão não for suportada, senão None.
+    """
+    version = request.META.get('HTTP_X_API_VERSION')
+    if not version:
+        return None
+
+    if version not in SUPPORTED_VERSIONS:
+        return JsonResponse(
+            {
+                'error': f'Versão da API {version} não suportada',
+                'supported_versions': list(SUPPORTED_VERSIONS)
+            },
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    request.api_version = version
+
+    urlconf = HEADER_URLCONFS.get(version)
+    if urlconf is not None:
+        request.urlconf = urlconf
+
+    return None
+
+
+class APIVersioning(BaseVersioning):
+    """
+    request.version do DRF: a URL versionada tem precedência; em /api/users/
+    vale a versão negociada pelo header, ou a padrão.
+    """
+
+    default_version = DEFAULT_VERSION
+    allowed_versions = SUPPORTED_VERSIONS
+
+    def determine_version(self, request, *args, **kwargs):
+        match = request.resolver_match
+        if match is not None and match.namespaces:
+            version = NAMESPACE_VERSIONS.get(match.namespaces[0])
+            if version is not None:
+                return version
+
+        return getattr(request._request, 'api_version', self.default_version)
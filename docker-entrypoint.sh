@@ -7,6 +7,12 @@ set -e
 echo "📊 Executando migrações do Django..."
 python manage.py migrate --noinput
 
+echo "🔒 Gerando blocklist de senhas..."
+python manage.py build_password_blocklist --skip-existing
+
+echo "📘 Gerando schema OpenAPI..."
+python manage.py build_openapi_schema
+
 echo "📦 Coletando arquivos estáticos..."
 python manage.py collectstatic --noinput --clear || true
 